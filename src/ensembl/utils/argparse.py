@@ -36,16 +36,24 @@ __all__ = [
 ]
 
 import argparse
+from functools import partial
 import os
 from pathlib import Path
 import re
+import sys
 from typing import Any, Callable
 
-from sqlalchemy.engine import make_url, URL
-
 from ensembl.utils import StrPath
 
 
+# NOTE: from 3.11 this tuple can be changed to: logging.getLevelNamesMapping().keys()
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# Names of the arguments of a server group (without prefix), including the URL built from them
+_SERVER_FIELDS = ("host", "port", "user", "password", "database", "url")
+# Matches the name of a server host argument, capturing its prefix
+_HOST_REGEX = re.compile(r"([\w-]*)host$")
+
+
 class ArgumentError(Exception):
     """An error from creating an argument (optional or positional)."""
 
@@ -60,8 +68,13 @@ class ArgumentParser(argparse.ArgumentParser):
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Extends the base class to include the information about default argument values by default."""
+        kwargs.setdefault("formatter_class", argparse.ArgumentDefaultsHelpFormatter)
         super().__init__(*args, **kwargs)
-        self.formatter_class = argparse.ArgumentDefaultsHelpFormatter
+        # Argument names of the server groups added (host, port, user, password, database and URL), to
+        # build their URL at parsing time
+        self._server_groups: list[tuple[str, ...]] = []
+        # Whether the first existing ancestor of a directory is writable, cached while parsing
+        self._dst_parent_cache: dict[str, bool] = {}
 
     def _validate_src_path(self, src_path: StrPath) -> Path:
         """Returns the path if exists and it is readable, raises an error through the parser otherwise.
@@ -71,10 +84,11 @@ class ArgumentParser(argparse.ArgumentParser):
 
         """
         src_path = Path(src_path)
-        if not src_path.exists():
+        # A single access() call covers the usual case, i.e. the path exists and it is readable
+        if not os.access(src_path, os.R_OK):
+            if src_path.exists():
+                self.error(f"'{src_path}' not readable")
             self.error(f"'{src_path}' not found")
-        elif not os.access(src_path, os.R_OK):
-            self.error(f"'{src_path}' not readable")
         return src_path
 
     def _validate_dst_path(self, dst_path: StrPath, exists_ok: bool = False) -> Path:
@@ -86,48 +100,92 @@ class ArgumentParser(argparse.ArgumentParser):
 
         """
         dst_path = Path(dst_path)
-        if dst_path.exists():
-            if os.access(dst_path, os.W_OK):
-                if exists_ok:
-                    return dst_path
-                self.error(f"'{dst_path}' already exists")
-            else:
-                self.error(f"'{dst_path}' is not writable")
+        # Only check if the path exists when it is not writable to avoid an extra system call
+        if os.access(dst_path, os.W_OK):
+            if exists_ok:
+                return dst_path
+            self.error(f"'{dst_path}' already exists")
+        elif dst_path.exists():
+            self.error(f"'{dst_path}' is not writable")
         # Check if the first parent directory that exists is writable
-        for parent_path in dst_path.parents:
-            if parent_path.exists():
-                if not os.access(parent_path, os.W_OK):
-                    self.error(f"'{dst_path}' is not writable")
-                break
+        parent_key = os.path.dirname(os.path.abspath(dst_path))
+        writable = self._dst_parent_cache.get(parent_key)
+        if writable is None:
+            writable = True
+            # Walk up the path as plain strings to avoid creating a new Path object per parent
+            parent_path = parent_key
+            while not os.access(parent_path, os.W_OK):
+                if os.path.exists(parent_path):
+                    writable = False
+                    break
+                parent_path, child_path = os.path.dirname(parent_path), parent_path
+                if parent_path == child_path:
+                    # Reached the root directory
+                    break
+            self._dst_parent_cache[parent_key] = writable
+        if not writable:
+            self.error(f"'{dst_path}' is not writable")
         return dst_path
 
-    def _validate_number(
+    def _get_number_validator(
         self,
-        value: str,
         value_type: Callable[[str], int | float],
         min_value: int | float | None,
         max_value: int | float | None,
-    ) -> int | float:
-        """Returns the numeric value if it is of the expected type and it is within the specified range.
+    ) -> Callable[[str], int | float]:
+        """Returns a function that converts a string into a numeric value of the expected type, checking it
+        is within the specified range and raising an error through the parser otherwise.
+
+        The range constrains are resolved once here instead of every time an argument value is parsed.
 
         Args:
-            value: String representation of numeric value to check.
             value_type: Expected type of the numeric value.
             min_value: Minimum value constrain. If `None`, no minimum value constrain.
             max_value: Maximum value constrain. If `None`, no maximum value constrain.
 
         """
-        # Check if the string representation can be converted to the expected type
-        try:
-            result = value_type(value)
-        except (TypeError, ValueError):
-            self.error(f"invalid {value_type.__name__} value: {value}")
-        # Check if numeric value is within range
-        if (min_value is not None) and (result < min_value):
-            self.error(f"{value} is lower than minimum value ({min_value})")
-        if (max_value is not None) and (result > max_value):
-            self.error(f"{value} is greater than maximum value ({max_value})")
-        return result
+        type_name = value_type.__name__
+
+        def _to_number(value: str) -> int | float:
+            # Check if the string representation can be converted to the expected type
+            try:
+                result = value_type(value)
+            except (TypeError, ValueError):
+                self.error(f"invalid {type_name} value: {value}")
+            return result
+
+        if (min_value is not None) and (max_value is not None):
+
+            def _validate_range(value: str) -> int | float:
+                result = _to_number(value)
+                # Single chained comparison for the common case, i.e. a value within range
+                if not min_value <= result <= max_value:
+                    if result < min_value:
+                        self.error(f"{value} is lower than minimum value ({min_value})")
+                    if result > max_value:
+                        self.error(f"{value} is greater than maximum value ({max_value})")
+                return result
+
+            return _validate_range
+        if min_value is not None:
+
+            def _validate_min(value: str) -> int | float:
+                result = _to_number(value)
+                if result < min_value:
+                    self.error(f"{value} is lower than minimum value ({min_value})")
+                return result
+
+            return _validate_min
+        if max_value is not None:
+
+            def _validate_max(value: str) -> int | float:
+                result = _to_number(value)
+                if result > max_value:
+                    self.error(f"{value} is greater than maximum value ({max_value})")
+                return result
+
+            return _validate_max
+        return _to_number
 
     def add_argument(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
         """Extends the parent function by excluding the default value in the help text when not provided.
@@ -160,7 +218,7 @@ class ArgumentParser(argparse.ArgumentParser):
 
         """
         kwargs.setdefault("metavar", "PATH")
-        kwargs["type"] = lambda x: self._validate_dst_path(x, exists_ok)
+        kwargs["type"] = partial(self._validate_dst_path, exists_ok=exists_ok)
         self.add_argument(*args, **kwargs)
 
     def add_argument_url(self, *args: Any, **kwargs: Any) -> None:
@@ -169,6 +227,9 @@ class ArgumentParser(argparse.ArgumentParser):
         If "metavar" is not defined it is added with "URI" as value to improve help text readability.
 
         """
+        # Import SQLAlchemy only when needed to keep the parser's startup time low
+        from sqlalchemy.engine import make_url  # pylint: disable=import-outside-toplevel
+
         kwargs.setdefault("metavar", "URI")
         kwargs["type"] = make_url
         self.add_argument(*args, **kwargs)
@@ -196,8 +257,8 @@ class ArgumentParser(argparse.ArgumentParser):
         # If both minimum and maximum values are defined, ensure min_value <= max_value
         if (min_value is not None) and (max_value is not None) and (min_value > max_value):
             raise ArgumentError("minimum value is greater than maximum value")
-        # Add lambda function to check numeric constrains when parsing argument
-        kwargs["type"] = lambda x: self._validate_number(x, type, min_value, max_value)
+        # Add function to check numeric constrains when parsing argument
+        kwargs["type"] = self._get_number_validator(type, min_value, max_value)
         self.add_argument(*args, **kwargs)
 
     # pylint: disable=redefined-builtin
@@ -216,12 +277,23 @@ class ArgumentParser(argparse.ArgumentParser):
             help: Description message to include for this set of arguments.
 
         """
+        # Intern the destination names so the lookups in the parsed Namespace compare by identity. Like
+        # argparse does, replace any "-" in the option names by "_" to get their destination names.
+        host, port, user, password, database, url = (
+            sys.intern(f"{prefix}{field}".replace("-", "_")) for field in _SERVER_FIELDS
+        )
         group = self.add_argument_group(f"{prefix}server connection arguments", description=help)
         group.add_argument(
-            f"--{prefix}host", required=True, metavar="HOST", default=argparse.SUPPRESS, help="host name"
+            f"--{prefix}host",
+            dest=host,
+            required=True,
+            metavar="HOST",
+            default=argparse.SUPPRESS,
+            help="host name",
         )
         group.add_argument(
             f"--{prefix}port",
+            dest=port,
             required=True,
             type=int,
             metavar="PORT",
@@ -229,17 +301,24 @@ class ArgumentParser(argparse.ArgumentParser):
             help="port number",
         )
         group.add_argument(
-            f"--{prefix}user", required=True, metavar="USER", default=argparse.SUPPRESS, help="user name"
+            f"--{prefix}user",
+            dest=user,
+            required=True,
+            metavar="USER",
+            default=argparse.SUPPRESS,
+            help="user name",
         )
-        group.add_argument(f"--{prefix}password", metavar="PWD", help="host password")
+        group.add_argument(f"--{prefix}password", dest=password, metavar="PWD", help="host password")
         if include_database:
             group.add_argument(
                 f"--{prefix}database",
+                dest=database,
                 required=True,
                 metavar="NAME",
                 default=argparse.SUPPRESS,
                 help="database name",
             )
+        self._server_groups.append((host, port, user, password, database, url))
 
     def add_log_arguments(self, add_log_file: bool = False) -> None:
         """Adds the usual set of arguments required to set and initialise a logging system.
@@ -252,9 +331,6 @@ class ArgumentParser(argparse.ArgumentParser):
                 `--log_file_level`.
 
         """
-        # Define the list of log levels available
-        log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        # NOTE: from 3.11 this list can be changed to: logging.getLevelNamesMapping().keys()
         # Create logging arguments group
         group = self.add_argument_group("logging arguments")
         # Add 3 mutually exclusive options to set the logging level
@@ -276,7 +352,7 @@ class ArgumentParser(argparse.ArgumentParser):
         )
         subgroup.add_argument(
             "--log",
-            choices=log_levels,
+            choices=_LOG_LEVELS,
             type=str.upper,
             default="WARNING",
             metavar="LEVEL",
@@ -288,46 +364,66 @@ class ArgumentParser(argparse.ArgumentParser):
             # Add log file-related arguments
             group.add_argument(
                 "--log_file",
-                type=lambda x: self._validate_dst_path(x, exists_ok=True),
+                type=partial(self._validate_dst_path, exists_ok=True),
                 metavar="PATH",
                 default=None,
                 help="log file path",
             )
             group.add_argument(
                 "--log_file_level",
-                choices=log_levels,
+                choices=_LOG_LEVELS,
                 type=str.upper,
                 default="DEBUG",
                 metavar="LEVEL",
                 help="level of the events to track in the log file: %(choices)s",
             )
 
+    def parse_known_args(  # type: ignore[override]
+        self, *args: Any, **kwargs: Any
+    ) -> tuple[argparse.Namespace, list[str]]:
+        """Extends the parent function to check again the destination paths checked by previous parsings."""
+        # Destination paths may have been created or changed since the last parsing
+        self._dst_parent_cache.clear()
+        return super().parse_known_args(*args, **kwargs)
+
     def parse_args(self, *args: Any, **kwargs: Any) -> argparse.Namespace:  # type: ignore[override]
         """Extends the parent function by adding a new URL argument for every server group added.
 
-        The type of this new argument will be `sqlalchemy.engine.URL`. It also logs all the parsed
-        arguments for debugging purposes when logging arguments have been added.
+        The server groups are the ones added via `add_server_arguments()`, plus any set of `host`, `port`,
+        `user` and `password` arguments with the same prefix added by other means. The type of this new
+        argument will be `sqlalchemy.engine.URL`. It also logs all the parsed arguments for debugging
+        purposes when logging arguments have been added.
 
         """
         arguments = super().parse_args(*args, **kwargs)
-        # Build and add an sqlalchemy.engine.URL object for every server group added
-        pattern = re.compile(r"([\w-]*)host$")
-        server_prefixes = [x.group(1) for x in map(pattern.match, vars(arguments)) if x]
-        for prefix in server_prefixes:
+        args_dict = vars(arguments)
+        # Detect the server groups not added via add_server_arguments() by their host argument
+        server_groups = list(self._server_groups)
+        known_hosts = {server_group[0] for server_group in server_groups}
+        for arg_name in args_dict:
+            if (arg_name not in known_hosts) and (match := _HOST_REGEX.match(arg_name)):
+                server_groups.append(tuple(f"{match.group(1)}{field}" for field in _SERVER_FIELDS))
+        if not server_groups:
+            return arguments
+        # Import SQLAlchemy only when needed to keep the parser's startup time low
+        from sqlalchemy.engine import URL  # pylint: disable=import-outside-toplevel
+
+        # Build and add an sqlalchemy.engine.URL object for every server group
+        for host, port, user, password, database, url in server_groups:
             # Raise an error rather than overwriting when the URL argument is already present
-            if f"{prefix}url" in arguments:
-                self.error(f"argument '{prefix}url' is already present")
+            if url in args_dict:
+                self.error(f"argument '{url}' is already present")
             try:
                 server_url = URL.create(
                     "mysql",
-                    getattr(arguments, f"{prefix}user"),
-                    getattr(arguments, f"{prefix}password"),
-                    getattr(arguments, f"{prefix}host"),
-                    getattr(arguments, f"{prefix}port"),
-                    getattr(arguments, f"{prefix}database", None),
+                    args_dict[user],
+                    args_dict[password],
+                    args_dict[host],
+                    args_dict[port],
+                    args_dict.get(database),
                 )
-            except AttributeError:
+            except KeyError:
                 # Not a database server host argument
                 continue
-            setattr(arguments, f"{prefix}url", server_url)
+            args_dict[url] = server_url
         return arguments
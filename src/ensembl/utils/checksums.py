@@ -14,12 +14,35 @@
 # limitations under the License.
 """Utils for common hash operations (often referred to as checksums) over files, e.g. MD5 or SHA128."""
 
+from functools import lru_cache, partial
 import hashlib
+import hmac
 from pathlib import Path
+import sys
+from typing import Callable
 
 from ensembl.utils import StrPath
 
 
+# Size (in bytes) of the chunks read when hashing a file
+_CHUNK_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=None)
+def _get_hash_constructor(algorithm: str) -> Callable[[], "hashlib._Hash"]:
+    """Returns the constructor of the hash object for the given algorithm.
+
+    Named constructors, e.g. `hashlib.md5()`, are faster than the generic `hashlib.new()`, which is only
+    used for algorithms without a named constructor.
+
+    Args:
+        algorithm: Secure hash or message digest algorithm name.
+    """
+    if algorithm in hashlib.algorithms_guaranteed:
+        return getattr(hashlib, algorithm)
+    return partial(hashlib.new, algorithm)
+
+
 def get_file_hash(file_path: StrPath, algorithm: str = "md5") -> str:
     """Returns the hash value for a given file and hash algorithm.
 
@@ -27,10 +50,17 @@ def get_file_hash(file_path: StrPath, algorithm: str = "md5") -> str:
         file_path: File path to get the hash for.
         algorithm: Secure hash or message digest algorithm name.
     """
-    hash_func = hashlib.new(algorithm)
     with Path(file_path).open("rb") as f:
-        data_bytes = f.read()
-    hash_func.update(data_bytes)
+        if sys.version_info >= (3, 11):
+            hash_func = hashlib.file_digest(f, _get_hash_constructor(algorithm))
+        else:
+            # Feed the file in chunks to avoid loading it entirely into memory, reusing the same buffer
+            # to avoid allocating a new bytes object per chunk (as hashlib.file_digest() does)
+            hash_func = _get_hash_constructor(algorithm)()
+            buffer = bytearray(_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while size := f.readinto(buffer):
+                hash_func.update(view[:size])
     return hash_func.hexdigest()
 
 
@@ -38,10 +68,22 @@ def validate_file_hash(file_path: StrPath, hash_value: str, algorithm: str = "md
     """Returns true if the file's hash value is the same as the one provided for that hash
     algorithm, false otherwise.
 
+    The hash values are compared case-insensitively, so uppercase hexadecimal values are also valid.
+
     Args:
         file_path: Path to the file to validate.
-        hash_value: Expected hash value.
+        hash_value: Expected hash value (hexadecimal, case-insensitive).
         algorithm: Secure hash or message digest algorithm name.
+
+    Raises:
+        ValueError: If the algorithm has a variable-length digest, e.g. "shake_128".
     """
+    digest_size = _get_hash_constructor(algorithm)().digest_size
+    # Variable-length digests have a digest size of 0 and require a length to compute the hash value
+    if not digest_size:
+        raise ValueError(f"Variable-length digest algorithm '{algorithm}' is not supported")
+    # Hexadecimal digests have two characters per byte: avoid reading the file if the length differs
+    if len(hash_value) != digest_size * 2:
+        return False
     file_hash = get_file_hash(file_path, algorithm)
-    return file_hash == hash_value
+    return hmac.compare_digest(file_hash.encode(), hash_value.lower().encode())
@@ -39,14 +39,18 @@ __all__ = [
     "UnitTestDB",
 ]
 
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from functools import lru_cache
 import os
 from pathlib import Path
-import subprocess
-from typing import Any
+import re
+from typing import Any, Callable
 
 import sqlalchemy
 from sqlalchemy import text
-from sqlalchemy.engine import make_url
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.pool import NullPool
 from sqlalchemy.schema import MetaData
 from sqlalchemy_utils.functions import create_database, database_exists, drop_database
 
@@ -55,6 +59,238 @@ from ensembl.utils.database.dbconnection import DBConnection, StrURL
 
 
 TEST_USERNAME = os.environ.get("USER", "pytestuser")
+# Constant MySQL session statements, built once to be reused by every test database
+_MYSQL_SESSION_SETUP = text("SET default_storage_engine=InnoDB, FOREIGN_KEY_CHECKS=0")
+_MYSQL_FOREIGN_KEY_CHECKS_OFF = text("SET FOREIGN_KEY_CHECKS=0")
+_MYSQL_FOREIGN_KEY_CHECKS_ON = text("SET FOREIGN_KEY_CHECKS=1")
+# Maximum number of tables whose data are imported at the same time
+_MAX_LOAD_WORKERS = 8
+# SQL tokens that may contain a ";" that does not end a statement (quoted strings, identifiers and
+# comments, including MySQL's "#" ones), or the statement separator itself
+_SQL_TOKEN_REGEX = re.compile(
+    r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|--[^\n]*|#[^\n]*|/\*.*?\*/|;""", re.DOTALL
+)
+# Dialects whose databases are created and dropped through a server engine shared by every test database,
+# mapped to the database to connect to and the "CREATE DATABASE" statement template (mirroring the ones
+# of sqlalchemy_utils, which is used for any other dialect)
+_SERVER_DIALECTS = {
+    "mysql": (None, "CREATE DATABASE {} CHARACTER SET = 'utf8'"),
+    "postgresql": ("postgres", "CREATE DATABASE {} ENCODING 'utf8' TEMPLATE template1"),
+}
+
+
+def _set_sqlite_pragmas(
+    dbapi_connection: Any,  # SQLAlchemy is not clear about the type of this argument
+    connection_record: sqlalchemy.pool.ConnectionPoolEntry,  # pylint: disable=unused-argument
+) -> None:
+    """Tunes SQLite for test databases, whose content does not need to survive a system crash."""
+    cursor = dbapi_connection.cursor()
+    # Write-ahead logging lets readers and a writer work concurrently, waiting for locks if needed
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    # Hand the writes to the operating system without waiting for them to reach the disk
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+@lru_cache(maxsize=None)
+def _server_engine(server_url: URL) -> sqlalchemy.engine.Engine:
+    """Returns the engine to issue statements to the given server, built once per server URL.
+
+    Connections are not pooled, so none is left open between statements, but the dialect is only
+    initialised once for all the test databases of the server.
+
+    Args:
+        server_url: URL of the server, with the database to connect to (if any).
+
+    """
+    return sqlalchemy.create_engine(server_url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+
+
+def _create_database(db_url: URL) -> None:
+    """Creates the database of the given URL, dropping it beforehand if it already exists.
+
+    Args:
+        db_url: Database URL.
+
+    """
+    backend = db_url.get_backend_name()
+    if backend not in _SERVER_DIALECTS:
+        if database_exists(db_url):
+            drop_database(db_url)
+        create_database(db_url)
+        return
+    server_db, create_template = _SERVER_DIALECTS[backend]
+    engine = _server_engine(db_url.set(database=server_db))
+    db_name = engine.dialect.identifier_preparer.quote(str(db_url.database))
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"DROP DATABASE IF EXISTS {db_name}")
+        conn.exec_driver_sql(create_template.format(db_name))
+
+
+def _drop_database(db_url: URL) -> None:
+    """Drops the database of the given URL.
+
+    Args:
+        db_url: Database URL.
+
+    """
+    backend = db_url.get_backend_name()
+    if backend not in _SERVER_DIALECTS:
+        drop_database(db_url)
+        return
+    engine = _server_engine(db_url.set(database=_SERVER_DIALECTS[backend][0]))
+    db_name = engine.dialect.identifier_preparer.quote(str(db_url.database))
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"DROP DATABASE {db_name}")
+
+
+def _remove_sqlite_files(db_file: Path) -> None:
+    """Removes the given SQLite database file and its write-ahead log files (if present).
+
+    Args:
+        db_file: SQLite database file path.
+
+    """
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_file}{suffix}").unlink(missing_ok=True)
+
+
+def _split_sql_statements(sql: str) -> list[str]:
+    """Returns the non-empty SQL statements in the given string, split by ";".
+
+    Semicolons within quoted strings or identifiers, or within comments, do not split statements.
+
+    Args:
+        sql: SQL statements.
+
+    """
+    statements = []
+    start = 0
+    for match in _SQL_TOKEN_REGEX.finditer(sql):
+        if match.group() == ";":
+            statements.append(sql[start : match.start()])
+            start = match.end()
+    statements.append(sql[start:])
+    return [statement for statement in statements if statement.strip()]
+
+
+@lru_cache(maxsize=32)
+def _read_schema_statements(schema_file: Path, _mtime_ns: int) -> tuple[str, ...]:
+    """Returns the SQL statements of the given schema file, read and split only once per file version.
+
+    Args:
+        schema_file: SQL schema file path.
+        _mtime_ns: Last modification time of the file, so a modified file is read again.
+
+    """
+    return tuple(_split_sql_statements(schema_file.read_text()))
+
+
+def _load_sqlite_data(conn: sqlalchemy.engine.Connection, table: str, src: StrPath) -> None:
+    """Inserts the table data from the given file into an SQLite database, streaming its rows.
+
+    SQLite does not have an equivalent to "LOAD DATA", so the rows are inserted instead. Like SQLite's
+    ".import" command, missing values at the end of a row are set to NULL and extra values are ignored.
+
+    Args:
+        conn: Open connection to the database.
+        table: Table name to insert the data to.
+        src: File path with the data in TSV format (without headers).
+
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    table_name = quote(table)
+    with Path(src).open("r", newline="") as tsv_file:
+        reader = csv.reader(tsv_file, delimiter="\t")
+        if sqlalchemy.inspect(conn).has_table(table):
+            num_columns = len(sqlalchemy.inspect(conn).get_columns(table))
+        else:
+            # Mimic SQLite's ".import" command: create the table using the first row as column names
+            header = next(reader, [])
+            columns = ", ".join(f"{quote(column)} TEXT" for column in header)
+            conn.exec_driver_sql(f"CREATE TABLE {table_name} ({columns})")
+            num_columns = len(header)
+        padding = [None] * num_columns
+
+        def _fit_row(row: list[str]) -> list[str | None]:
+            """Returns the row with exactly one value per table column."""
+            if len(row) == num_columns:
+                return row  # type: ignore[return-value]
+            return (row + padding)[:num_columns]
+
+        placeholders = ", ".join("?" * num_columns)
+        # Stream the rows straight to the driver's connection, which shares the ongoing transaction,
+        # to skip SQLAlchemy's statement and parameter processing
+        driver_conn = conn.connection.driver_connection
+        assert driver_conn is not None
+        driver_conn.executemany(f"INSERT INTO {table_name} VALUES ({placeholders})", map(_fit_row, reader))
+
+
+def _load_postgresql_data(conn: sqlalchemy.engine.Connection, table: str, src: StrPath) -> None:
+    """Loads the table data from the given file into a PostgreSQL database.
+
+    The file is streamed from the client, so the server does not need access to it.
+
+    Args:
+        conn: Open connection to the database.
+        table: Table name to load the data to.
+        src: File path with the data in TSV format (without headers).
+
+    """
+    table_name = conn.dialect.identifier_preparer.quote(table)
+    cursor = conn.connection.cursor()
+    try:
+        with Path(src).open("r") as tsv_file:
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2
+                cursor.copy_expert(f"COPY {table_name} FROM STDIN", tsv_file)
+            else:
+                # psycopg 3+
+                with cursor.copy(f"COPY {table_name} FROM STDIN") as copy:
+                    while data := tsv_file.read(1 << 20):
+                        copy.write(data)
+    finally:
+        cursor.close()
+
+
+def _load_sqlserver_data(conn: sqlalchemy.engine.Connection, table: str, src: StrPath) -> None:
+    """Loads the table data from the given file into an SQL Server database.
+
+    Args:
+        conn: Open connection to the database.
+        table: Table name to load the data to.
+        src: File path with the data in TSV format (without headers).
+
+    """
+    table_name = conn.dialect.identifier_preparer.quote(table)
+    # BULK INSERT does not accept a parameter as file path, so escape it as a string literal
+    src_path = str(src).replace("'", "''")
+    conn.execute(text(f"BULK INSERT {table_name} FROM '{src_path}'"))
+
+
+def _load_mysql_data(conn: sqlalchemy.engine.Connection, table: str, src: StrPath) -> None:
+    """Loads the table data from the given file into a MySQL database.
+
+    Args:
+        conn: Open connection to the database.
+        table: Table name to load the data to.
+        src: File path with the data in TSV format (without headers).
+
+    """
+    table_name = conn.dialect.identifier_preparer.quote(table)
+    statement = text(f"LOAD DATA LOCAL INFILE :src INTO TABLE {table_name}")
+    conn.execute(statement, {"src": str(Path(src).resolve())})
+
+
+# Data loading function per dialect, falling back to MySQL's for any other dialect
+_DATA_LOADERS: dict[str, Callable[[sqlalchemy.engine.Connection, str, StrPath], None]] = {
+    "postgresql": _load_postgresql_data,
+    "sqlite": _load_sqlite_data,
+    "sqlserver": _load_sqlserver_data,
+}
 
 
 class UnitTestDB:
@@ -86,63 +322,112 @@ class UnitTestDB:
         metadata: MetaData | None = None,
         tmp_path: StrPath | None = None,
     ) -> None:
+        dump_path = Path(dump_dir) if dump_dir else None
+        # One data file per table, named after it
+        tsv_files = list(dump_path.glob("*.txt")) if dump_path else []
         db_url = make_url(server_url)
+        # The backend name comes from the URL itself, so there is no need to load the dialect to get it
+        backend = db_url.get_backend_name()
         if not name:
-            name = Path(dump_dir).name if dump_dir else "testdb"
+            name = dump_path.name if dump_path else "testdb"
         db_name = f"{TEST_USERNAME}_{name}"
 
         # Add the database name to the URL
-        if db_url.get_dialect().name == "sqlite":
+        if backend == "sqlite":
             db_path = Path(tmp_path) / db_name if tmp_path else db_name
             db_url = db_url.set(database=f"{db_path}.db")
         else:
             db_url = db_url.set(database=db_name)
         # Enable "local_infile" variable for MySQL databases to allow importing data from files
         connect_args = {}
-        if db_url.get_dialect().name == "mysql":
+        if backend == "mysql":
             connect_args["local_infile"] = 1
         # Create the database, dropping it beforehand if it already exists
-        if database_exists(db_url):
-            drop_database(db_url)
-        create_database(db_url)
+        if backend == "sqlite":
+            # SQLite creates the database file when it first writes to it, so there is no need to connect
+            db_file = Path(str(db_url.database))
+            _remove_sqlite_files(db_file)
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            _create_database(db_url)
         # Establish the connection to the database, load the schema and import the data
         try:
-            self.dbc = DBConnection(db_url, connect_args=connect_args, reflect=False)
-            self._load_schema_and_data(dump_dir, metadata)
+            # Test databases are short-lived, so their connections do not need to be checked before use
+            self.dbc = DBConnection(db_url, connect_args=connect_args, reflect=False, pool_pre_ping=False)
+            self._load_schema_and_data(dump_path, metadata, tsv_files)
         except:
             # Make sure the database is deleted before raising the exception
-            drop_database(db_url)
+            if hasattr(self, "dbc"):
+                self.dbc.dispose()
+            if backend == "sqlite":
+                _remove_sqlite_files(Path(str(db_url.database)))
+            else:
+                _drop_database(db_url)
             raise
-        # Update the loaded metadata information of the database
-        self.dbc.load_metadata()
+        # Update the loaded metadata information of the database. If the schema comes from the given
+        # metadata, it is already in memory, unless SQLite created additional tables when importing data
+        dump_tables = {tsv_file.stem for tsv_file in tsv_files}
+        if (metadata is not None) and dump_tables.issubset(metadata.tables):
+            self.dbc.set_metadata(metadata)
+        else:
+            self.dbc.load_metadata()
 
     def _load_schema_and_data(
-        self, dump_dir: StrPath | None = None, metadata: MetaData | None = None
+        self, dump_dir: Path | None, metadata: MetaData | None, tsv_files: list[Path]
     ) -> None:
+        if self.dbc.dialect == "sqlite":
+            # Apply the pragmas to every connection of the pool, before the first one is opened
+            self.dbc.add_connect_listener(_set_sqlite_pragmas)
         with self.dbc.begin() as conn:
             # Set InnoDB engine as default and disable foreign key checks for MySQL databases
             if self.dbc.dialect == "mysql":
-                conn.execute(text("SET default_storage_engine=InnoDB"))
-                conn.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+                # A single SET statement can assign several variables, saving round trips to the server
+                conn.execute(_MYSQL_SESSION_SETUP)
 
             # Load the schema
             if metadata:
                 metadata.create_all(conn)
             elif dump_dir:
-                with Path(dump_dir, "table.sql").open("r") as schema:
-                    for query in "".join(schema.readlines()).split(";"):
-                        if query.strip():
-                            conn.execute(text(query))
+                # Test databases are often built several times from the same dump, so reuse its statements
+                schema_file = dump_dir / "table.sql"
+                for query in _read_schema_statements(schema_file, schema_file.stat().st_mtime_ns):
+                    # The schema has no parameters, so skip their processing
+                    conn.exec_driver_sql(query, execution_options={"no_parameters": True})
 
-            # And import any available data for each table
-            if dump_dir:
-                for tsv_file in Path(dump_dir).glob("*.txt"):
-                    table = tsv_file.stem
-                    self._load_data(conn, table, tsv_file)
+            if self.dbc.dialect == "sqlite":
+                # Write the database header, so the file is a valid database even without any tables
+                conn.exec_driver_sql("PRAGMA user_version = 0")
+            # Only MySQL can disable the foreign key checks of every connection, so its tables can be loaded
+            # in any order. Import the data of any other database in this same transaction, as SQLite only
+            # allows one writer at a time and the other databases would check the foreign keys of a table
+            # against tables that may not be loaded yet.
+            if self.dbc.dialect != "mysql":
+                for tsv_file in tsv_files:
+                    self._load_data(conn, tsv_file.stem, tsv_file)
+                tsv_files = []
 
             # Re-enable foreign key checks for MySQL databases
             if self.dbc.dialect == "mysql":
-                conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+                conn.execute(_MYSQL_FOREIGN_KEY_CHECKS_ON)
+
+        # Import the data of each MySQL table in parallel, each one in its own connection
+        if tsv_files:
+            with ThreadPoolExecutor(max_workers=min(_MAX_LOAD_WORKERS, len(tsv_files))) as executor:
+                # Consume the results to raise any exception from the workers
+                list(executor.map(self._load_table_data, tsv_files))
+
+    def _load_table_data(self, tsv_file: Path) -> None:
+        """Imports the data of the MySQL table named after the given file in a new transaction.
+
+        Args:
+            tsv_file: File path with the data in TSV format (without headers).
+
+        """
+        with self.dbc.begin() as conn:
+            # Foreign key checks are set per session in MySQL databases
+            conn.execute(_MYSQL_FOREIGN_KEY_CHECKS_OFF)
+            self._load_data(conn, tsv_file.stem, tsv_file)
+            conn.execute(_MYSQL_FOREIGN_KEY_CHECKS_ON)
 
     def __repr__(self) -> str:
         """Returns a string representation of this object."""
@@ -150,9 +435,17 @@ class UnitTestDB:
 
     def drop(self) -> None:
         """Drops the database."""
-        drop_database(self.dbc.url)
-        # Ensure the connection pool is properly closed and disposed
+        if self.dbc.dialect == "sqlite":
+            # Close the connections before removing the database file
+            self.dbc.dispose()
+            db_file = Path(str(self.dbc.db_name))
+            # Raise an error if the database does not exist, like for any other dialect
+            db_file.unlink()
+            _remove_sqlite_files(db_file)
+            return
+        # Close the connections first, as the server may refuse to drop a database that is in use
         self.dbc.dispose()
+        _drop_database(make_url(self.dbc.url))
 
     def _load_data(self, conn: sqlalchemy.engine.Connection, table: str, src: StrPath) -> None:
         """Loads the table data from the given file.
@@ -163,15 +456,7 @@ class UnitTestDB:
             src: File path with the data in TSV format (without headers).
 
         """
-        if self.dbc.dialect == "sqlite":
-            # SQLite does not have an equivalent to "LOAD DATA": use its ".import" command instead
-            subprocess.run(["sqlite3", self.dbc.db_name, ".mode tabs", f".import {src} {table}"], check=True)
-        elif self.dbc.dialect == "postgresql":
-            conn.execute(text(f"COPY {table} FROM '{src}'"))
-        elif self.dbc.dialect == "sqlserver":
-            conn.execute(text(f"BULK INSERT {table} FROM '{src}'"))
-        else:
-            conn.execute(text(f"LOAD DATA LOCAL INFILE '{src}' INTO TABLE {table}"))
+        _DATA_LOADERS.get(self.dbc.dialect, _load_mysql_data)(conn, table, src)
 
     def __enter__(self) -> UnitTestDB:
         return self
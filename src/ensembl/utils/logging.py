@@ -34,14 +34,87 @@ __all__ = [
 ]
 
 import argparse
+import atexit
 import logging
-from typing import Optional, Union
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+import queue
+import time
+from typing import Any, Optional, Union
 
 from ensembl.utils import StrPath
 
 
 LogLevel = Union[int, str]
 
+# Listener handling the log records in the background, if requested when initialising the logging system
+_queue_listener: Optional[QueueListener] = None
+# Arguments of init_logging() that can be provided via an argument parser's Namespace
+_LOG_ARG_NAMES = ("log_level", "log_file", "log_file_level")
+# Marker for the arguments missing from a Namespace
+_MISSING = object()
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the formatted date/time of the previous log record if logged in the same second.
+
+    `time.strftime()` has a resolution of one second, so all the records logged within the same second
+    share the same formatted date/time.
+
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Second and date format of the last formatted date/time, alongside the latter
+        self._last_time: tuple[int, Optional[str], str] = (-1, None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """Returns the creation time of the given log record formatted as requested.
+
+        Args:
+            record: Log record.
+            datefmt: A format string for the date/time. If not provided, the default ISO8601-like format
+                is used (including milliseconds, which are not cached).
+
+        """
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        last_second, last_datefmt, last_time = self._last_time
+        if (second != last_second) or (datefmt != last_datefmt):
+            last_time = time.strftime(datefmt, self.converter(record.created))
+            self._last_time = (second, datefmt, last_time)
+        return last_time
+
+
+class _BufferedFileHandler(MemoryHandler):
+    """Buffers the log records in memory and writes them in batches into its target file handler.
+
+    Unlike its parent class, closing this handler also closes its target.
+
+    """
+
+    def close(self) -> None:
+        """Flushes the buffered log records and closes both this handler and its target."""
+        try:
+            super().close()
+        finally:
+            if self.target:
+                self.target.close()
+
+
+def _stop_queue_listener() -> None:
+    """Stops the background log listener (if any), handling any pending record, and closes its handlers."""
+    global _queue_listener  # pylint: disable=global-statement
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+    for handler in _queue_listener.handlers:
+        handler.close()
+    _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
 
 def init_logging(
     log_level: LogLevel = "WARNING",
@@ -49,12 +122,18 @@ def init_logging(
     log_file_level: LogLevel = "DEBUG",
     msg_format: str = "%(asctime)s\t%(levelname)s\t%(message)s",
     date_format: str = r"%Y-%m-%d_%H:%M:%S",
+    *,
+    buffer_capacity: Optional[int] = None,
+    buffer_flush_level: int = logging.ERROR,
+    background: bool = False,
 ) -> None:
     """Initialises the logging system.
 
     By default, all the log messages corresponding to `log_level` (and above) will be printed in the
     standard error. If `log_file` is provided, all messages of `log_file_level` level (and above) will
-    be written into the provided file.
+    be written into the provided file as soon as they are logged. If `buffer_capacity` is provided, they
+    are buffered in memory instead and written in batches, when the buffer is full, when a message of
+    `buffer_flush_level` level (or above) is logged, or at exit.
 
     Args:
         log_level: Minimum logging level for the standard error.
@@ -64,21 +143,42 @@ def init_logging(
             https://docs.python.org/3/library/logging.html#logrecord-attributes
         date_format: A format string for the date/time portion of the logged output. More information:
             https://docs.python.org/3/library/logging.html#logging.Formatter.formatTime
+        buffer_capacity: Maximum number of messages buffered before writing them into the logging file.
+            By default, the messages are not buffered.
+        buffer_flush_level: Minimum logging level that triggers writing the buffered messages (only used
+            if `buffer_capacity` is provided).
+        background: Format and write the messages in a background thread, so logging a message only
+            requires adding it to a queue.
 
     """
+    global _queue_listener  # pylint: disable=global-statement
+    # Make sure the messages of a previous background logging system are handled before replacing it
+    _stop_queue_listener()
     # Configure the basic logging system, setting the root logger to the minimum log level available
     # to avoid filtering messages in any handler due to "parent delegation". Also close and remove any
     # existing handlers before setting this configuration.
     logging.basicConfig(format=msg_format, datefmt=date_format, level="DEBUG", force=True)
+    # Use the same formatter for every handler, caching the date/time of the records logged each second
+    formatter = _CachedTimeFormatter(msg_format, datefmt=date_format)
     # Set the correct log level of the new StreamHandler (by default it is set to NOTSET)
     logging.root.handlers[0].setLevel(log_level)
+    logging.root.handlers[0].setFormatter(formatter)
     if log_file:
-        # Create the log file handler and add it to the root logger
-        formatter = logging.Formatter(msg_format, datefmt=date_format)
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(log_file_level)
+        # Create the log file handler and add it to the root logger, opening the file on the first write
+        file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8", delay=True)
         file_handler.setFormatter(formatter)
-        logging.root.addHandler(file_handler)
+        log_file_handler: logging.Handler = file_handler
+        if buffer_capacity:
+            # Batch the writes into the file to reduce the number of system calls
+            log_file_handler = _BufferedFileHandler(buffer_capacity, buffer_flush_level, file_handler)
+        log_file_handler.setLevel(log_file_level)
+        logging.root.addHandler(log_file_handler)
+    if background:
+        # Move the handlers to the background listener, feeding them via a queue from the root logger
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_listener = QueueListener(log_queue, *logging.root.handlers, respect_handler_level=True)
+        logging.root.handlers = [QueueHandler(log_queue)]
+        _queue_listener.start()
 
 
 def init_logging_with_args(args: argparse.Namespace) -> None:
@@ -88,6 +188,7 @@ def init_logging_with_args(args: argparse.Namespace) -> None:
         args: Namespace populated by an argument parser.
 
     """
-    args_dict = vars(args)
-    log_args = {x: args_dict[x] for x in ["log_level", "log_file", "log_file_level"] if x in args_dict}
+    log_args = {
+        name: value for name in _LOG_ARG_NAMES if (value := getattr(args, name, _MISSING)) is not _MISSING
+    }
     init_logging(**log_args)
@@ -16,11 +16,13 @@
 
 from __future__ import annotations
 
-from difflib import unified_diff
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 import os
 from pathlib import Path
 import re
-from typing import Callable, Generator, TypeAlias
+from typing import Any, Callable, Generator, TypeAlias
 
 import pytest
 from pytest import Config, FixtureRequest, Parser
@@ -30,9 +32,60 @@ from sqlalchemy.schema import MetaData
 from ensembl.utils import StrPath
 from ensembl.utils.database import UnitTestDB
 
+# Use the native implementation of unified_diff() if available, as it is notably faster on large files
+try:
+    from difflib_rs import unified_diff
+except ImportError:
+    from difflib import unified_diff  # type: ignore[assignment]
+
 
 DBFactory: TypeAlias = Callable[[StrPath | None, str | None, MetaData | None], UnitTestDB]
 
+# Matches the password of a server URL (if any), capturing the text surrounding it
+_PASSWORD_REGEX = re.compile(r"(//[^/]+:).*(@)")
+# Maximum number of unit test databases built or dropped at the same time
+_MAX_DB_WORKERS = 8
+# Number of bytes compared at a time when checking if two files are equal
+_COMPARE_CHUNK_SIZE = 1 << 20
+# Maximum number of diff lines reported when two files differ
+_MAX_DIFF_LINES = 200
+
+
+@lru_cache(maxsize=None)
+def _module_data_dir(module_file: str) -> Path:
+    """Returns the path to the test data folder matching the given test module file.
+
+    Args:
+        module_file: Path to the test module file.
+
+    """
+    return Path(module_file).with_suffix("")
+
+
+def _files_equal(path1: StrPath, path2: StrPath) -> bool:
+    """Returns True if both files have the same content, False otherwise.
+
+    The files are read sequentially and compared chunk by chunk, so they are never fully loaded in memory.
+
+    Args:
+        path1: First file path.
+        path2: Second file path.
+
+    """
+    with open(path1, "rb") as file1, open(path2, "rb") as file2:
+        stat1 = os.fstat(file1.fileno())
+        stat2 = os.fstat(file2.fileno())
+        # Both paths may point to the same file, which does not need to be read to be equal to itself
+        if os.path.samestat(stat1, stat2):
+            return True
+        if stat1.st_size != stat2.st_size:
+            return False
+        # Stop reading at the first chunk that differs
+        while chunk := file1.read(_COMPARE_CHUNK_SIZE):
+            if chunk != file2.read(_COMPARE_CHUNK_SIZE):
+                return False
+        return True
+
 
 def pytest_addoption(parser: Parser) -> None:
     """Registers argparse-style options for Ensembl's unit testing.
@@ -90,7 +143,7 @@ def pytest_report_header(config: Config) -> str:
     """
     # Show server information, masking the password value
     server = config.getoption("server")
-    server = re.sub(r"(//[^/]+:).*(@)", r"\1xxxxxx\2", server)
+    server = _PASSWORD_REGEX.sub(r"\1xxxxxx\2", server)
     return f"server: {server}"
 
 
@@ -102,10 +155,10 @@ def local_data_dir(request: FixtureRequest) -> Path:
         request: Fixture that provides information of the requesting test function.
 
     """
-    return Path(request.module.__file__).with_suffix("")
+    return _module_data_dir(request.module.__file__)
 
 
-@pytest.fixture(name="assert_files")
+@pytest.fixture(name="assert_files", scope="session")
 def fixture_assert_files() -> Callable[[StrPath, StrPath], None]:
     """Returns a function that asserts if two text files are equal, or prints their differences."""
 
@@ -117,11 +170,18 @@ def fixture_assert_files() -> Callable[[StrPath, StrPath], None]:
             expected_path: Path to expected file.
 
         """
+        # Byte-wise comparison first: the files only need to be decoded if their bytes differ
+        if _files_equal(result_path, expected_path):
+            return
+        # Files may still be equal as text, e.g. if they only differ in their line endings
         with open(result_path, "r") as result_fh:
             results = result_fh.readlines()
         with open(expected_path, "r") as expected_fh:
             expected = expected_fh.readlines()
-        files_diff = list(
+        if results == expected:
+            return
+        # difflib_rs takes the same arguments as difflib, but returns a list instead of a generator
+        diff_lines = iter(
             unified_diff(
                 results,
                 expected,
@@ -129,6 +189,10 @@ def fixture_assert_files() -> Callable[[StrPath, StrPath], None]:
                 tofile=f"Expected file {Path(expected_path).name}",
             )
         )
+        # Only generate the beginning of the diff, which is enough to spot the differences
+        files_diff = list(islice(diff_lines, _MAX_DIFF_LINES))
+        if next(diff_lines, None) is not None:
+            files_diff.append("... (truncated)\n")
         assert_message = f"Test-made and expected files differ\n{' '.join(files_diff)}"
         assert len(files_diff) == 0, assert_message
 
@@ -139,6 +203,9 @@ def fixture_assert_files() -> Callable[[StrPath, StrPath], None]:
 def fixture_db_factory(request: FixtureRequest, data_dir: Path) -> Generator[DBFactory, None, None]:
     """Yields a unit test database factory.
 
+    When running in parallel with pytest-xdist, the database names are prefixed by the worker ID, so each
+    worker has its own databases.
+
     Args:
         request: Fixture that provides information of the requesting test function.
         data_dir: Fixture that provides the path to the test data folder matching the test's name.
@@ -146,6 +213,7 @@ def fixture_db_factory(request: FixtureRequest, data_dir: Path) -> Generator[DBF
     """
     created: dict[str, UnitTestDB] = {}
     server_url = request.config.getoption("server")
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
 
     def _db_factory(
         src: StrPath | None, name: str | None = None, metadata: MetaData | None = None
@@ -167,15 +235,23 @@ def fixture_db_factory(request: FixtureRequest, data_dir: Path) -> Generator[DBF
         else:
             db_key = name if name else "dbkey"
             dump_dir = None
-        return created.setdefault(
-            db_key, UnitTestDB(server_url, dump_dir=dump_dir, name=name, metadata=metadata)
-        )
+        # Only build the database if not done yet, as building a new one loads its schema and data
+        test_db = created.get(db_key)
+        if test_db is None:
+            if worker_id:
+                # Use the same default name as UnitTestDB
+                name = f"{worker_id}_{name or (dump_dir.name if dump_dir else 'testdb')}"
+            test_db = UnitTestDB(server_url, dump_dir=dump_dir, name=name, metadata=metadata)
+            created[db_key] = test_db
+        return test_db
 
     yield _db_factory
     # Drop all unit test databases unless the user has requested to keep them
-    if not request.config.getoption("keep_dbs"):
-        for test_db in created.values():
-            test_db.drop()
+    if not request.config.getoption("keep_dbs") and created:
+        # Each database is dropped independently, so drop them in parallel
+        with ThreadPoolExecutor(max_workers=min(_MAX_DB_WORKERS, len(created))) as executor:
+            # Consume the results to raise any exception from the workers
+            list(executor.map(UnitTestDB.drop, created.values()))
 
 
 @pytest.fixture(scope="module")
@@ -209,7 +285,8 @@ def test_dbs(request: FixtureRequest, db_factory: Callable) -> dict[str, UnitTes
         db_factory: Fixture that provides a unit test database factory.
 
     """
-    databases = {}
+    # Database arguments per key, keeping the first ones found as db_factory() would
+    db_arguments: dict[str, dict[str, Any]] = {}
     for argument in request.param:
         src = argument.get("src", None)
         if src is not None:
@@ -219,5 +296,10 @@ def test_dbs(request: FixtureRequest, db_factory: Callable) -> dict[str, UnitTes
             key = name or src.name
         except AttributeError as exc:
             raise TypeError("Expected at least 'src' or 'name' argument defined") from exc
-        databases[key] = db_factory(src=src, name=name, metadata=argument.get("metadata"))
-    return databases
+        db_arguments.setdefault(key, {"src": src, "name": name, "metadata": argument.get("metadata")})
+    if not db_arguments:
+        return {}
+    # Build the databases in parallel, as most of the work is done by the server
+    with ThreadPoolExecutor(max_workers=min(_MAX_DB_WORKERS, len(db_arguments))) as executor:
+        futures = {key: executor.submit(db_factory, **kwargs) for key, kwargs in db_arguments.items()}
+        return {key: future.result() for key, future in futures.items()}
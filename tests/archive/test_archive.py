@@ -18,11 +18,22 @@ import filecmp
 from pathlib import Path
 
 import pytest
-from pytest import param
+from pytest import FixtureRequest, TempPathFactory, param
 
 from ensembl.utils.archive import open_gz_file, extract_file
 
 
+@pytest.fixture(name="extract_tmp", scope="module")
+def fixture_extract_tmp(tmp_path_factory: TempPathFactory) -> Path:
+    """Returns a temporary directory path shared by all the tests of this module.
+
+    Args:
+        tmp_path_factory: Session-scoped fixture to create arbitrary temporary directories.
+
+    """
+    return tmp_path_factory.mktemp("extract")
+
+
 @pytest.mark.parametrize(
     "src_file, expected_file",
     [
@@ -42,12 +53,8 @@ def test_open_gz_file(data_dir: Path, src_file: str, expected_file: str) -> None
     """
     # Get content of archive file
     with open_gz_file(data_dir / src_file) as in_file:
-        src_content = in_file.readlines()
-    # Get expected content
-    expected_path = data_dir / expected_file
-    with expected_path.open("r") as in_file:
-        expected_content = in_file.readlines()
-    assert src_content == expected_content
+        src_content = in_file.read()
+    assert src_content == (data_dir / expected_file).read_text()
 
 
 @pytest.mark.parametrize(
@@ -58,15 +65,21 @@ def test_open_gz_file(data_dir: Path, src_file: str, expected_file: str) -> None
         param("sample.txt", "sample.txt", id="uncompressed file"),
     ],
 )
-def test_extract_file(tmp_path: Path, data_dir: Path, src_file: str, expected_output: str) -> None:
+def test_extract_file(
+    request: FixtureRequest, extract_tmp: Path, data_dir: Path, src_file: str, expected_output: str
+) -> None:
     """Tests `extract_file()` function.
 
     Args:
-        tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+        request: Fixture that provides information of the requesting test function.
+        extract_tmp: Fixture that provides a temporary directory path shared by this module's tests.
         data_dir: Fixture that provides the path to the test data folder matching the test's name.
         src_file: Source file to extract.
         expected_output: File with the expected content after extracting the source file.
 
     """
-    extract_file(data_dir / src_file, tmp_path)
-    assert filecmp.cmp(tmp_path / expected_output, data_dir / expected_output)
+    # Every case extracts the same output file, so use a different folder for each one
+    dst_dir = extract_tmp / request.node.callspec.id
+    dst_dir.mkdir()
+    extract_file(data_dir / src_file, dst_dir)
+    assert filecmp.cmp(dst_dir / expected_output, data_dir / expected_output)
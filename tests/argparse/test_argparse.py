@@ -15,51 +15,84 @@
 """Unit testing of `ensembl.utils.argparse` module."""
 # pylint: disable=too-many-positional-arguments
 
+import argparse
 from contextlib import nullcontext as does_not_raise
+from itertools import chain
+import os
 from pathlib import Path
 import re
 from typing import Any, Callable, ContextManager
+from uuid import uuid4
 
 import pytest
-from pytest import param, raises
+from pytest import CaptureFixture, MonkeyPatch, TempPathFactory, param, raises
 from sqlalchemy.engine import make_url
 
+from ensembl.utils import StrPath
 from ensembl.utils.argparse import ArgumentError, ArgumentParser
 
 
+# Expected help text of the "--foo" argument when required or optional
+_HELP_REQUIRED_REGEX = re.compile(r" +--foo FOO +text")
+_HELP_OPTIONAL_REGEX = re.compile(r" +--foo FOO +text \(default: None\)")
+
+
 def _args_dict_to_cmd_list(args_dict: dict[str, Any]) -> list[str]:
     """Returns a flattened version of the arguments dictionary in a list with every element as a string.
 
     It will add "--" to every key of the dictionary, and will not add empty values (for flag arguments).
 
     """
-    cmd_args = []
-    for key, value in args_dict.items():
-        cmd_args.append(f"--{key}")
-        if value:
-            cmd_args.append(str(value))
-    return cmd_args
+    return list(
+        chain.from_iterable(
+            (f"--{key}", str(value)) if value else (f"--{key}",) for key, value in args_dict.items()
+        )
+    )
+
+
+@pytest.fixture(name="parser")
+def fixture_parser() -> ArgumentParser:
+    """Returns a new argument parser with the default configuration."""
+    return ArgumentParser()
+
+
+@pytest.fixture(name="shared_tmp", scope="module")
+def fixture_shared_tmp(tmp_path_factory: TempPathFactory) -> Path:
+    """Returns a temporary directory path shared by all the tests of this module.
+
+    Args:
+        tmp_path_factory: Session-scoped fixture to create arbitrary temporary directories.
+
+    """
+    return tmp_path_factory.mktemp("argparse_paths")
 
 
 class TestArgumentParser:
     """Tests `ArgumentParser` class."""
 
-    def test_validate_unreadable_src_path(self, tmp_path: Path) -> None:
+    def test_validate_unreadable_src_path(
+        self,
+        parser: ArgumentParser,
+        data_dir: Path,
+        monkeypatch: MonkeyPatch,
+        capsys: CaptureFixture[str],
+    ) -> None:
         """Tests `ArgumentParser._validate_src_path()` method for an unreadable file.
 
         Args:
-            tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+            parser: Fixture that provides a new argument parser.
+            data_dir: Fixture that provides the path to the test data folder matching the test's name.
+            monkeypatch: Fixture that allows to safely patch and mock functionality in tests.
+            capsys: Fixture that captures the standard output and error.
 
         """
-        # Create file and make it unreadable
-        src_path = tmp_path / "forbidden.txt"
-        with src_path.open("w") as in_file:
-            in_file.write("you shall not read this")
-        src_path.chmod(0o222)
+        # Make every path unreadable instead of creating a file without read permissions
+        monkeypatch.setattr(os, "access", lambda path, mode: False)
+        src_path = data_dir / "sample.txt"
         # Attempt to validate source path
-        parser = ArgumentParser()
         with raises(SystemExit):
             parser._validate_src_path(src_path)  # pylint: disable=protected-access
+        assert "not readable" in capsys.readouterr().err
 
     @pytest.mark.parametrize(
         "is_dir",
@@ -68,28 +101,50 @@ class TestArgumentParser:
             param(False, id="Destination path is a directory"),
         ],
     )
-    def test_validate_unwritable_dst_path(self, tmp_path: Path, is_dir: bool) -> None:
+    def test_validate_unwritable_dst_path(
+        self, parser: ArgumentParser, shared_tmp: Path, is_dir: bool
+    ) -> None:
         """Tests `ArgumentParser._validate_dst_path()` method for an unwritable path.
 
         Args:
-            tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+            parser: Fixture that provides a new argument parser.
+            shared_tmp: Fixture that provides a temporary directory path shared by this module's tests.
             is_dir: Make the unwritable destination path a directory (`True`) or file (`False`).
 
         """
         # Create a file or directory and make it unreadable
         if is_dir:
-            dst_path = tmp_path / "read-only" / "read-only.txt"
+            dst_path = shared_tmp / f"read-only-{uuid4().hex}" / "read-only.txt"
             dst_path.parent.mkdir(mode=0o555)
         else:
-            dst_path = tmp_path / "read-only.txt"
-            with dst_path.open("w") as in_file:
-                in_file.write("you shall not edit this")
-            dst_path.chmod(0o444)
+            dst_path = shared_tmp / f"read-only-{uuid4().hex}.txt"
+            # Create the file already read-only, as its content is irrelevant
+            dst_path.touch(mode=0o444)
         # Attempt to validate source path
-        parser = ArgumentParser()
         with raises(SystemExit):
             parser._validate_dst_path(dst_path)  # pylint: disable=protected-access
 
+    @pytest.mark.parametrize(
+        "formatter_class, expected_formatter_class",
+        [
+            param(None, argparse.ArgumentDefaultsHelpFormatter, id="Default formatter class"),
+            param(argparse.RawTextHelpFormatter, argparse.RawTextHelpFormatter, id="Custom formatter class"),
+        ],
+    )
+    def test_init(
+        self, formatter_class: type[argparse.HelpFormatter] | None, expected_formatter_class: type
+    ) -> None:
+        """Tests that the object `ArgumentParser` is initialised correctly.
+
+        Args:
+            formatter_class: Help formatter class to pass to the parser, if any.
+            expected_formatter_class: Help formatter class expected to be used by the parser.
+
+        """
+        kwargs = {"formatter_class": formatter_class} if formatter_class else {}
+        parser = ArgumentParser(**kwargs)
+        assert parser.formatter_class is expected_formatter_class
+
     @pytest.mark.dependency(name="add_argument")
     @pytest.mark.parametrize(
         "required",
@@ -98,19 +153,16 @@ class TestArgumentParser:
             param(False, id="Add optional argument"),
         ],
     )
-    def test_add_argument(self, required: bool) -> None:
+    def test_add_argument(self, parser: ArgumentParser, required: bool) -> None:
         """Tests `ArgumentParser.add_argument()` method.
 
         Args:
+            parser: Fixture that provides a new argument parser.
             required: Set argument as required (`True`) or optional (`False`).
 
         """
-        parser = ArgumentParser()
         parser.add_argument("--foo", help="text", required=required)
-        if required:
-            pattern = re.compile(r" +--foo FOO +text")
-        else:
-            pattern = re.compile(r" +--foo FOO +text \(default: None\)")
+        pattern = _HELP_REQUIRED_REGEX if required else _HELP_OPTIONAL_REGEX
         assert pattern.search(parser.format_help()) is not None
 
     @pytest.mark.dependency(depends=["add_argument"])
@@ -122,17 +174,19 @@ class TestArgumentParser:
             param("invalid.txt", raises(SystemExit), id="Input file does not exist"),
         ],
     )
-    def test_add_argument_src_path(self, data_dir: Path, src_path: str, expectation: ContextManager) -> None:
+    def test_add_argument_src_path(
+        self, parser: ArgumentParser, data_dir: Path, src_path: str, expectation: ContextManager
+    ) -> None:
         """Tests `ArgumentParser.add_argument_src_path()` method.
 
         Args:
+            parser: Fixture that provides a new argument parser.
             data_dir: Fixture that provides the path to the test data folder matching the test's name.
             src_path: Input file name.
             expectation: Context manager for the expected exception.
 
         """
         # Add "--src_path" argument to the parser and its command line
-        parser = ArgumentParser()
         parser.add_argument_src_path("--src_path")
         cmd_args = ["--src_path", str(data_dir / src_path)]
         # Check that the argument is properly parsed
@@ -151,11 +205,17 @@ class TestArgumentParser:
         ],
     )
     def test_add_argument_dst_path(
-        self, data_dir: Path, dst_path: str, exists_ok: bool, expectation: ContextManager
+        self,
+        parser: ArgumentParser,
+        data_dir: Path,
+        dst_path: str,
+        exists_ok: bool,
+        expectation: ContextManager,
     ) -> None:
         """Tests `ArgumentParser.add_argument_dst_path()` method.
 
         Args:
+            parser: Fixture that provides a new argument parser.
             data_dir: Fixture that provides the path to the test data folder matching the test's name.
             dst_path: Relative path to destination directory/file.
             exists_ok: Do not raise an error if the destination path already exists.
@@ -163,19 +223,53 @@ class TestArgumentParser:
 
         """
         # Add "--dst_path" argument to the parser and its command line
-        parser = ArgumentParser()
         parser.add_argument_dst_path("--dst_path", exists_ok=exists_ok)
-        cmd_args = ["--dst_path", str(data_dir / dst_path)]
+        # The command line takes strings, so only build a Path to check the parsed value
+        dst_arg = os.path.join(data_dir, dst_path)
+        cmd_args = ["--dst_path", dst_arg]
         # Check that the argument is properly parsed
         with expectation:
             args = parser.parse_args(cmd_args)
-            assert args.dst_path == data_dir / dst_path
+            assert args.dst_path == Path(dst_arg)
 
     @pytest.mark.dependency(depends=["add_argument"])
-    def test_add_argument_url(self) -> None:
-        """Tests `ArgumentParser.add_argument_url()` method."""
+    def test_add_argument_dst_path_shared_parent(
+        self, parser: ArgumentParser, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        """Tests that `ArgumentParser.add_argument_dst_path()` checks a shared parent once per parsing.
+
+        Args:
+            parser: Fixture that provides a new argument parser.
+            tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+            monkeypatch: Fixture that allows to safely patch and mock functionality in tests.
+
+        """
+        accessed_paths = []
+        os_access = os.access
+
+        def _access(path: StrPath, mode: int) -> bool:
+            accessed_paths.append(os.fspath(path))
+            return os_access(path, mode)
+
+        monkeypatch.setattr(os, "access", _access)
+        parser.add_argument_dst_path("--dst_file1")
+        parser.add_argument_dst_path("--dst_file2")
+        cmd_args = ["--dst_file1", str(tmp_path / "file1.txt"), "--dst_file2", str(tmp_path / "file2.txt")]
+        parser.parse_args(cmd_args)
+        assert accessed_paths.count(str(tmp_path)) == 1
+        # Every new parsing checks the shared parent directory again
+        parser.parse_known_args(cmd_args)
+        assert accessed_paths.count(str(tmp_path)) == 2
+
+    @pytest.mark.dependency(depends=["add_argument"])
+    def test_add_argument_url(self, parser: ArgumentParser) -> None:
+        """Tests `ArgumentParser.add_argument_url()` method.
+
+        Args:
+            parser: Fixture that provides a new argument parser.
+
+        """
         # Add "--url" argument to the parser and its command line
-        parser = ArgumentParser()
         parser.add_argument_url("--url")
         cmd_args = ["--url", "https://github.com"]
         # Check that the argument is properly parsed
@@ -197,6 +291,7 @@ class TestArgumentParser:
     )
     def test_add_numeric_argument(
         self,
+        parser: ArgumentParser,
         value: str,
         value_type: Callable[[str], int | float],
         min_value: int | float | None,
@@ -206,6 +301,7 @@ class TestArgumentParser:
         """Tests `ArgumentParser.add_numeric_argument()` method.
 
         Args:
+            parser: Fixture that provides a new argument parser.
             value: Argument value.
             value_type: Expected argument type.
             min_value: Minimum value constrain. If `None`, no minimum value constrain.
@@ -213,7 +309,6 @@ class TestArgumentParser:
             expectation: Context manager for the expected exception.
 
         """
-        parser = ArgumentParser()
         # Add numeric argument to parser and its command line, and check that the argument is properly parsed
         with expectation:
             parser.add_numeric_argument("--num", type=value_type, min_value=min_value, max_value=max_value)
@@ -227,19 +322,20 @@ class TestArgumentParser:
         [
             param("", False, id="Basic call"),
             param("src", False, id="Add prefix"),
+            param("src-", False, id="Add prefix with hyphen"),
             param("", True, id="Add database argument"),
         ],
     )
-    def test_add_server_arguments(self, prefix: str, include_database: bool) -> None:
+    def test_add_server_arguments(self, parser: ArgumentParser, prefix: str, include_database: bool) -> None:
         """Tests `ArgumentParser.add_server_arguments()` method.
 
         Args:
+            parser: Fixture that provides a new argument parser.
             prefix: Prefix to add the each argument.
             include_database: Include `--database` argument.
 
         """
         # Add server arguments to the parser and its command line
-        parser = ArgumentParser()
         parser.add_server_arguments(prefix=prefix, include_database=include_database)
         cmd_args = {
             f"{prefix}host": "lugh",
@@ -253,9 +349,10 @@ class TestArgumentParser:
             url += "/my_db"
         # Check that the arguments are properly parsed
         args = parser.parse_args(_args_dict_to_cmd_list(cmd_args))
+        # Like argparse, the argument names replace any "-" by "_"
         for arg_name, value in cmd_args.items():
-            assert getattr(args, arg_name) == value
-        assert getattr(args, f"{prefix}url") == make_url(url)
+            assert getattr(args, arg_name.replace("-", "_")) == value
+        assert getattr(args, f"{prefix}url".replace("-", "_")) == make_url(url)
 
     @pytest.mark.dependency(depends=["add_argument"])
     @pytest.mark.parametrize(
@@ -273,17 +370,19 @@ class TestArgumentParser:
             ),
         ],
     )
-    def test_add_log_arguments(self, add_log_file: bool, cmd_args: dict[str, Any], log_level: str) -> None:
+    def test_add_log_arguments(
+        self, parser: ArgumentParser, add_log_file: bool, cmd_args: dict[str, Any], log_level: str
+    ) -> None:
         """Tests `ArgumentParser.add_log_arguments()` method.
 
         Args:
+            parser: Fixture that provides a new argument parser.
             add_log_file: Add arguments to allow storing messages into a file.
             cmd_args: Command line arguments to pass to the parser.
             log_level: Logging level expected.
 
         """
         # Add log arguments to the parser and its command line
-        parser = ArgumentParser()
         parser.add_log_arguments(add_log_file=add_log_file)
         # Check that the argument is properly parsed
         args = parser.parse_args(_args_dict_to_cmd_list(cmd_args))
@@ -293,28 +392,46 @@ class TestArgumentParser:
                 assert getattr(args, arg_name) == value
 
     @pytest.mark.dependency(depends=["add_server_arguments"])
-    def test_parse_args_url_arg_present(self) -> None:
+    def test_parse_args_url_arg_present(self, parser: ArgumentParser) -> None:
         """Tests `ArgumentParser.parse_args()` method when server arguments and a URL argument all
         with the same prefix are added to the parser.
 
+        Args:
+            parser: Fixture that provides a new argument parser.
+
         """
         # Add server arguments with prefix "src" and URL argument with the same prefix to the parser
-        parser = ArgumentParser()
         parser.add_server_arguments("src_")
         parser.add_argument_url("--src_url")
         # Check that the error is handled properly
         with raises(SystemExit):
             parser.parse_args(["--src_host", "host", "--src_port", "42", "--src_user", "username"])
 
+    @pytest.mark.dependency(depends=["add_argument"])
+    def test_parse_args_manual_server_arguments(self, parser: ArgumentParser) -> None:
+        """Tests `ArgumentParser.parse_args()` method when server arguments are added one by one.
+
+        Args:
+            parser: Fixture that provides a new argument parser.
+
+        """
+        for arg_name in ("host", "user", "password"):
+            parser.add_argument(f"--src_{arg_name}")
+        parser.add_argument("--src_port", type=int)
+        args = parser.parse_args(["--src_host", "lugh", "--src_port", "42", "--src_user", "username"])
+        assert args.src_url == make_url("mysql://username@lugh:42")
+
     @pytest.mark.dependency(depends=["add_server_arguments"])
-    def test_parse_args_not_server_host(self) -> None:
+    def test_parse_args_not_server_host(self, parser: ArgumentParser) -> None:
         """Tests `ArgumentParser.parse_args()` method when a non-database server host is added as argument.
 
         This test checks that arguments with a `host` suffix in their names (e.g. `file_host`) are
         parsed correctly.
 
+        Args:
+            parser: Fixture that provides a new argument parser.
+
         """
-        parser = ArgumentParser()
         parser.add_argument("--file_host")
         args = parser.parse_args(["--file_host", "host"])
         assert args.file_host == "host"
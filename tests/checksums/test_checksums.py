@@ -17,7 +17,7 @@
 from pathlib import Path
 
 import pytest
-from pytest import param
+from pytest import param, raises
 
 from ensembl.utils.checksums import get_file_hash, validate_file_hash
 
@@ -26,6 +26,17 @@ TEST_FILE_MD5_HASH = "0d17ea963a2c325f759fc4066f2fc9b2"
 TEST_FILE_SHA256_HASH = "f76e2e362c0f7ba15ea2052bcf91debda446479eb610d4a47754ef2a33829649"
 
 
+@pytest.fixture(name="test_file", scope="module")
+def fixture_test_file(data_dir: Path) -> Path:
+    """Returns the path to the test file whose hash values are known.
+
+    Args:
+        data_dir: Fixture that provides the path to the test data folder matching the test's name.
+
+    """
+    return data_dir / "file.txt"
+
+
 @pytest.mark.dependency(name="test_get_file_hash")
 @pytest.mark.parametrize(
     "algorithm, expected_hash_value",
@@ -34,39 +45,48 @@ TEST_FILE_SHA256_HASH = "f76e2e362c0f7ba15ea2052bcf91debda446479eb610d4a47754ef2
         ("sha256", TEST_FILE_SHA256_HASH),
     ],
 )
-def test_get_file_hash(data_dir: Path, algorithm: str, expected_hash_value: str) -> None:
+def test_get_file_hash(test_file: Path, algorithm: str, expected_hash_value: str) -> None:
     """Tests `get_file_hash()` function.
 
     Fixtures:
-        data_dir
+        test_file
 
     Args:
-    hash_algorithm: Secure hash or message digest algorithm name.
+        algorithm: Secure hash or message digest algorithm name.
         expected_hash_value: Expected hash value.
     """
-    file_path = data_dir / "file.txt"
-    result = get_file_hash(file_path, algorithm=algorithm)
+    result = get_file_hash(test_file, algorithm=algorithm)
     assert result == expected_hash_value
 
 
 @pytest.mark.dependency(depends=["test_get_file_hash"])
 @pytest.mark.parametrize(
-    "file_name, hash_value, expected_result",
+    "hash_value, expected_result",
     [
-        param("file.txt", TEST_FILE_MD5_HASH, True, id="Correct hash"),
-        param("file.txt", "not_a_hash", False, id="Wrong hash"),
+        param(TEST_FILE_MD5_HASH, True, id="Correct hash"),
+        param(TEST_FILE_MD5_HASH.upper(), True, id="Correct uppercase hash"),
+        param("not_a_hash", False, id="Wrong hash"),
+        param(TEST_FILE_MD5_HASH[::-1], False, id="Wrong hash with correct length"),
     ],
 )
-def test_validate_file_hash(data_dir: Path, file_name: str, hash_value: str, expected_result: bool) -> None:
+def test_validate_file_hash(test_file: Path, hash_value: str, expected_result: bool) -> None:
     """Tests `validate_file_hash()` function.
 
     Fixtures:
-        data_dir
+        test_file
 
     Args:
-        file_path: Path to the file to validate.
         hash_value: Expected hash value.
         expected_result: Expected result of the validation.
     """
-    file_path = data_dir / file_name
-    assert validate_file_hash(file_path, hash_value) == expected_result
+    assert validate_file_hash(test_file, hash_value) == expected_result
+
+
+def test_validate_file_hash_variable_length(test_file: Path) -> None:
+    """Tests that `validate_file_hash()` raises an error for variable-length digest algorithms.
+
+    Fixtures:
+        test_file
+    """
+    with raises(ValueError, match="shake_128"):
+        validate_file_hash(test_file, "a" * 32, algorithm="shake_128")
@@ -14,16 +14,18 @@
 # limitations under the License.
 """Unit testing of `ensembl.utils.database.dbconnection` module."""
 
+import os
 from pathlib import Path
+from typing import Any, Generator
 
 import pytest
-from pytest import FixtureRequest, param
+from pytest import FixtureRequest, MonkeyPatch, param
 from sqlalchemy_utils import create_database, database_exists, drop_database
-from sqlalchemy import Integer, text, Sequence, String
+from sqlalchemy import Integer, func, select, text, Sequence, String
 from sqlalchemy.orm import Mapped
-from sqlalchemy.engine.url import make_url
+from sqlalchemy.engine.url import URL, make_url
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.automap import automap_base
+from sqlalchemy.pool import NullPool
 
 # Support both SQLAlchemy 1.4+ and 2.0+
 try:
@@ -54,6 +56,12 @@ class MockTable(MockBase):
 
 mock_metadata = MockBase.metadata
 
+# Queries to count the rows in "gibberish" table, in total or for a given ID
+_COUNT_QUERY = text("SELECT COUNT(*) FROM gibberish")
+_COUNT_BY_ID_QUERY = text("SELECT COUNT(*) FROM gibberish WHERE id = :id")
+# Statement to change the schema of a test database
+_CREATE_NEW_TABLE = text("CREATE TABLE new_table (id INTEGER PRIMARY KEY)")
+
 
 @pytest.mark.parametrize("test_dbs", [[{"src": "mock_db"}]], indirect=True)
 class TestDBConnection:
@@ -62,11 +70,17 @@ class TestDBConnection:
     Attributes:
         dbc: Test database connection.
         server: Server URL where the test database is hosted.
+        server_url: Parsed server URL.
+        expected_db_name: Expected name of the test database.
+        is_myisam: Whether the `gibberish` table uses MySQL's MyISAM engine, which has no transactions.
 
     """
 
     dbc: DBConnection = None
     server: str = ""
+    server_url: URL = None
+    expected_db_name: str = ""
+    is_myisam: bool = False
 
     @pytest.fixture(scope="class", autouse=True)
     @classmethod
@@ -80,6 +94,31 @@ class TestDBConnection:
         """
         cls.dbc = test_dbs["mock_db"].dbc
         cls.server = request.config.getoption("server")
+        cls.server_url = make_url(cls.server)
+        # The plugin prefixes the database name with the pytest-xdist worker ID (if any)
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        db_name = f"{worker_id}_mock_db" if worker_id else "mock_db"
+        cls.expected_db_name = f"{TEST_USERNAME}_{db_name}"
+        # SQLite databases are named after their file
+        if cls.server_url.get_backend_name() == "sqlite":
+            cls.expected_db_name += ".db"
+        cls.is_myisam = (
+            cls.dbc.dialect == "mysql"
+            and cls.dbc.tables["gibberish"].dialect_options["mysql"]["engine"] == "MyISAM"
+        )
+
+    @pytest.fixture(name="gibberish_model", scope="class")
+    @classmethod
+    def fixture_gibberish_model(cls) -> Any:
+        """Returns the mapped class of the `gibberish` table, reflecting the schema once for all the tests."""
+        # Only import the automap extension when needed, as it is not required by most tests
+        from sqlalchemy.ext.automap import automap_base  # pylint: disable=import-outside-toplevel
+
+        # Session requires mapped classes to interact with the database
+        Base = automap_base()
+        with cls.dbc.connect() as con:
+            Base.prepare(autoload_with=con)
+        return Base.classes.gibberish
 
     @pytest.mark.dependency(name="test_init", scope="class")
     def test_init(self) -> None:
@@ -89,31 +128,28 @@ class TestDBConnection:
     @pytest.mark.dependency(name="test_dialect", depends=["test_init"], scope="class")
     def test_dialect(self) -> None:
         """Tests `DBConnection.dialect` property."""
-        assert self.dbc.dialect == make_url(self.server).drivername
+        assert self.dbc.dialect == self.server_url.drivername
 
     @pytest.mark.dependency(name="test_db_name", depends=["test_init", "test_dialect"], scope="class")
     def test_db_name(self) -> None:
         """Tests `DBConnection.db_name` property."""
-        expected_db_name = f"{TEST_USERNAME}_mock_db"
-        if self.dbc.dialect == "sqlite":
-            expected_db_name += ".db"
-        assert self.dbc.db_name == expected_db_name
+        assert self.dbc.db_name == self.expected_db_name
 
     @pytest.mark.dependency(depends=["test_init", "test_dialect", "test_db_name"], scope="class")
     def test_url(self) -> None:
         """Tests `DBConnection.url` property."""
-        expected_url = make_url(self.server).set(database=self.dbc.db_name)
+        expected_url = self.server_url.set(database=self.dbc.db_name)
         assert self.dbc.url == expected_url.render_as_string(hide_password=False)  # pylint: disable=no-member
 
     @pytest.mark.dependency(depends=["test_init"], scope="class")
     def test_host(self) -> None:
         """Tests `DBConnection.host` property."""
-        assert self.dbc.host == make_url(self.server).host
+        assert self.dbc.host == self.server_url.host
 
     @pytest.mark.dependency(depends=["test_init"], scope="class")
     def test_port(self) -> None:
         """Tests `DBConnection.port` property."""
-        assert self.dbc.port == make_url(self.server).port
+        assert self.dbc.port == self.server_url.port
 
     @pytest.mark.dependency(depends=["test_init"], scope="class")
     def test_tables(self) -> None:
@@ -144,8 +180,8 @@ class TestDBConnection:
         """Tests `DBConnection.connect()` method."""
         connection = self.dbc.connect()
         assert connection, "Connection object should not be empty"
-        result = connection.execute(text("SELECT * FROM gibberish"))
-        assert len(result.fetchall()) == 6, "Unexpected number of rows found in 'gibberish' table"
+        num_rows = connection.execute(_COUNT_QUERY).scalar_one()
+        assert num_rows == 6, "Unexpected number of rows found in 'gibberish' table"
         connection.close()
 
     @pytest.mark.dependency(depends=["test_init"], scope="class")
@@ -153,8 +189,22 @@ class TestDBConnection:
         """Tests `DBConnection.begin()` method."""
         with self.dbc.begin() as connection:
             assert connection, "Connection object should not be empty"
-            result = connection.execute(text("SELECT * FROM gibberish"))
-            assert len(result.fetchall()) == 6, "Unexpected number of rows found in 'gibberish' table"
+            num_rows = connection.execute(_COUNT_QUERY).scalar_one()
+            assert num_rows == 6, "Unexpected number of rows found in 'gibberish' table"
+
+    @pytest.mark.dependency(depends=["test_init"], scope="class")
+    def test_execute(self) -> None:
+        """Tests `DBConnection.execute()` method."""
+        result = self.dbc.execute("SELECT COUNT(*) FROM gibberish WHERE grp = :grp", {"grp": "grp2"})
+        assert result.scalar_one() == 3, "Unexpected number of rows found in 'gibberish' table"
+        result = self.dbc.execute(_COUNT_QUERY)
+        assert result.scalar_one() == 6, "Unexpected number of rows found in 'gibberish' table"
+
+    @pytest.mark.dependency(depends=["test_init"], scope="class")
+    def test_stream(self) -> None:
+        """Tests `DBConnection.stream()` method."""
+        rows = list(self.dbc.stream("SELECT id FROM gibberish ORDER BY id"))
+        assert [row.id for row in rows] == [1, 2, 3, 4, 5, 6]
 
     @pytest.mark.dependency(depends=["test_init"], scope="class")
     def test_dispose(self) -> None:
@@ -176,75 +226,74 @@ class TestDBConnection:
         ],
     )
     def test_session_scope(
-        self, identifier: int, rows_to_add: list[dict[str, str]], before: int, after: int
+        self,
+        gibberish_model: Any,
+        identifier: int,
+        rows_to_add: list[dict[str, str]],
+        before: int,
+        after: int,
     ) -> None:
         """Tests `DBConnection.session_scope()` method.
 
-        Bear in mind that the second parameterization of this test will fail if the dialect/table engine
-        does not support rollback transactions.
+        The second parameterization of this test is skipped if the table engine does not support rollback
+        transactions, i.e. MyISAM.
 
         Args:
+            gibberish_model: Fixture that provides the mapped class of the `gibberish` table.
             identifier: ID of the rows to add.
             rows_to_add: Rows to add to the `gibberish` table.
             before: Number of rows in `gibberish` table for `id` before adding the rows.
             after: Number of rows in `gibberish` table for `id` after adding the rows.
 
         """
+        # The rows are expected to be rolled back when the number of rows does not change
+        if self.is_myisam and (before == after):
+            pytest.skip("MyISAM tables do not support rollback transactions")
         with self.dbc.session_scope() as session:
-            query = text(f"SELECT * FROM gibberish WHERE id = {identifier}")
-            results = session.execute(query)
-            assert len(results.fetchall()) == before
-
-        # Session requires mapped classes to interact with the database
-        Base = automap_base()
-        with self.dbc.connect() as con:
-            Base.prepare(autoload_with=con)
-            Gibberish = Base.classes.gibberish
-
-            # Ignore IntegrityError raised when committing the new tags as some parametrizations will force it
-            try:
-                with self.dbc.session_scope() as session:
-                    rows = [Gibberish(id=identifier, **x) for x in rows_to_add]
-                    session.add_all(rows)
-            except IntegrityError:
-                pass
+            assert session.execute(_COUNT_BY_ID_QUERY, {"id": identifier}).scalar_one() == before
+
+        # Ignore IntegrityError raised when committing the new tags as some parametrizations will force it
+        rows = [gibberish_model(id=identifier, **x) for x in rows_to_add]
+        try:
+            with self.dbc.session_scope() as session:
+                session.add_all(rows)
+        except IntegrityError:
+            pass
+        else:
+            # The committed objects should still be accessible outside the session scope
+            assert [row.grp for row in rows] == [x["grp"] for x in rows_to_add]
 
         with self.dbc.session_scope() as session:
-            results = session.execute(query)
-            assert len(results.fetchall()) == after
+            assert session.execute(_COUNT_BY_ID_QUERY, {"id": identifier}).scalar_one() == after
 
     @pytest.mark.dependency(depends=["test_init", "test_connect"], scope="class")
-    def test_test_session_scope(self) -> None:
-        """Tests `DBConnection.test_session_scope()` method."""
-        # Session requires mapped classes to interact with the database
-        Base = automap_base()
-        with self.dbc.connect() as con:
-            Base.prepare(autoload_with=con)
-            Gibberish = Base.classes.gibberish
+    def test_test_session_scope(self, gibberish_model: Any) -> None:
+        """Tests `DBConnection.test_session_scope()` method.
 
+        Args:
+            gibberish_model: Fixture that provides the mapped class of the `gibberish` table.
+
+        """
+        Gibberish = gibberish_model
         # First add some rows within a scope
         identifier = 8
+        count_query = select(func.count()).select_from(Gibberish).where(Gibberish.id == identifier)
         with self.dbc.test_session_scope() as session:
-            results = session.query(Gibberish).filter_by(id=identifier)
-            assert not results.all(), f"ID {identifier} should not have any entries"
+            num_rows = session.scalar(count_query)
+            assert num_rows == 0, f"ID {identifier} should not have any entries"
             session.add(Gibberish(id=identifier, grp="grp7", value=15))
             session.add(Gibberish(id=identifier, grp="grp8", value=25))
             session.commit()
-            results = session.query(Gibberish).filter_by(id=identifier)
-            assert len(results.all()) == 2, f"ID {identifier} should have two rows"
+            num_rows = session.scalar(count_query)
+            assert num_rows == 2, f"ID {identifier} should have two rows"
 
         # Check that the tags added during the previous scope have been removed
         with self.dbc.test_session_scope() as session:
-            results = session.execute(text(f"SELECT * FROM gibberish WHERE id = {identifier}"))
-            if (
-                self.dbc.dialect == "mysql"
-                and self.dbc.tables["gibberish"].dialect_options["mysql"]["engine"] == "MyISAM"
-            ):
-                assert len(results.all()) == 2, f"MyISAM: 2 rows permanently added to ID {identifier}"
+            num_rows = session.execute(_COUNT_BY_ID_QUERY, {"id": identifier}).scalar_one()
+            if self.is_myisam:
+                assert num_rows == 2, f"MyISAM: 2 rows permanently added to ID {identifier}"
             else:
-                assert (
-                    not results.fetchall()
-                ), f"No entries should have been permanently added to ID {identifier}"
+                assert num_rows == 0, f"No entries should have been permanently added to ID {identifier}"
 
 
 @pytest.mark.parametrize(
@@ -254,50 +303,155 @@ class TestDBConnection:
         param(False, set(), id="No reflection"),
     ],
 )
-def test_reflect(request: FixtureRequest, data_dir: Path, reflect: bool, tables: set) -> None:
+def test_reflect(request: FixtureRequest, data_dir: Path, tmp_path: Path, reflect: bool, tables: set) -> None:
     """Tests the object `DBConnection` with and without reflection."""
 
-    # Create a test db
+    # Create a test db with its own name, so it does not replace the one of TestDBConnection in this module
+    server_url = request.config.getoption("server")
+    with UnitTestDB(
+        server_url, dump_dir=data_dir / "mock_db", name="test_reflect", tmp_path=tmp_path
+    ) as test_db:
+        con = DBConnection(test_db.dbc.url, reflect=reflect, poolclass=NullPool)
+        assert set(con.tables.keys()) == tables
+        con.dispose()
+
+
+def test_reflect_on_first_access(request: FixtureRequest, data_dir: Path, tmp_path: Path) -> None:
+    """Tests that `DBConnection` delays the reflection until the tables are first accessed."""
     server_url = request.config.getoption("server")
-    test_db = UnitTestDB(server_url, dump_dir=data_dir / "mock_db")
-    test_db_url = test_db.dbc.url
-    con = DBConnection(test_db_url, reflect=reflect)
-    assert set(con.tables.keys()) == tables
+    with UnitTestDB(
+        server_url, dump_dir=data_dir / "mock_db", name="test_reflect_on_first_access", tmp_path=tmp_path
+    ) as test_db:
+        con = DBConnection(test_db.dbc.url, poolclass=NullPool)
+        # Tables created after the object has been initialised should be part of the reflected schema
+        with con.begin() as conn:
+            conn.execute(_CREATE_NEW_TABLE)
+        assert set(con.tables.keys()) == {"gibberish", "new_table"}
+        con.dispose()
+
+
+def test_set_metadata(request: FixtureRequest, data_dir: Path, tmp_path: Path) -> None:
+    """Tests that `DBConnection.set_metadata()` replaces the schema without reflecting it."""
+    server_url = request.config.getoption("server")
+    with UnitTestDB(
+        server_url, dump_dir=data_dir / "mock_db", name="test_set_metadata", tmp_path=tmp_path
+    ) as test_db:
+        con = DBConnection(test_db.dbc.url, poolclass=NullPool)
+        con.set_metadata(mock_metadata)
+        assert set(con.tables.keys()) == {"mock_table"}
+        con.dispose()
+
+
+def test_add_connect_listener(request: FixtureRequest, data_dir: Path, tmp_path: Path) -> None:
+    """Tests that `DBConnection.add_connect_listener()` passes every new DBAPI connection to the listener."""
+    server_url = request.config.getoption("server")
+    with UnitTestDB(
+        server_url, dump_dir=data_dir / "mock_db", name="test_add_connect_listener", tmp_path=tmp_path
+    ) as test_db:
+        con = DBConnection(test_db.dbc.url, reflect=False, poolclass=NullPool)
+        connections = []
+        con.add_connect_listener(lambda dbapi_connection, _: connections.append(dbapi_connection))
+        with con.connect() as conn:
+            assert connections == [conn.connection.dbapi_connection]
+        con.dispose()
+
+
+def test_metadata_cache(
+    request: FixtureRequest, data_dir: Path, tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """Tests the metadata cache of `DBConnection`."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    server_url = request.config.getoption("server")
+    with UnitTestDB(
+        server_url, dump_dir=data_dir / "mock_db", name="test_metadata_cache", tmp_path=tmp_path
+    ) as test_db:
+        # The first connection reflects the schema and stores it in the cache
+        con = DBConnection(test_db.dbc.url, metadata_cache=True)
+        assert set(con.tables.keys()) == {"gibberish"}
+        assert len(list((tmp_path / "ensembl-utils").glob("*.pkl"))) == 1
+        # The next connection should load the metadata from the cache, without reflecting the schema
+        with monkeypatch.context() as m:
+            m.setattr("sqlalchemy.MetaData.reflect", lambda *args, **kwargs: pytest.fail("reflected"))
+            con = DBConnection(test_db.dbc.url, metadata_cache=True)
+            assert set(con.tables.keys()) == {"gibberish"}
+            assert con.get_columns("gibberish") == test_db.dbc.get_columns("gibberish")
+        # A schema change should trigger a new reflection
+        with con.begin() as conn:
+            conn.execute(_CREATE_NEW_TABLE)
+        con.load_metadata()
+        assert set(con.tables.keys()) == {"gibberish", "new_table"}
+        con.dispose()
+
+
+def test_pool_options(request: FixtureRequest, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Tests the connection pool options of `DBConnection`."""
+    # Explicit options should take precedence over the environment ones
+    monkeypatch.setenv("ENSEMBL_DB_POOL_SIZE", "7")
+    server_url = request.config.getoption("server")
+    with UnitTestDB(server_url, name="test_pool_options", tmp_path=tmp_path) as test_db:
+        con = DBConnection(test_db.dbc.url, reflect=False, pool_size=3, max_overflow=2)
+        assert con._engine.pool.size() == 3  # pylint: disable=protected-access
+        con.dispose()
 
 
-def test_create_all_tables(request: FixtureRequest) -> None:
-    """Tests the method `DBConnection.create_all_tables()`."""
+@pytest.fixture(name="empty_db_url", scope="module")
+def fixture_empty_db_url(request: FixtureRequest) -> Generator[URL, None, None]:
+    """Yields the URL of an empty database shared by the tests of this module, dropping it at the end.
 
-    # Create a test db
+    Tests using it should leave the database empty when they finish.
+
+    Args:
+        request: Fixture that provides information of the requesting test function.
+
+    """
     db_url = make_url(request.config.getoption("server"))
-    db_name = f"{TEST_USERNAME}_test_create_all_tables"
-    db_url = db_url.set(database=db_name)
+    db_url = db_url.set(database=f"{TEST_USERNAME}_test_empty_db")
     if database_exists(db_url):
         drop_database(db_url)
     create_database(db_url)
+    yield db_url
+    drop_database(db_url)
+
+
+def test_create_all_tables(empty_db_url: URL) -> None:
+    """Tests the method `DBConnection.create_all_tables()`.
+
+    Args:
+        empty_db_url: Fixture that provides the URL of an empty database.
 
+    """
+    # Do not keep idle connections around, as the connection is only used for a couple of statements
+    test_db = DBConnection(empty_db_url, reflect=False, poolclass=NullPool)
     try:
-        test_db = DBConnection(db_url, reflect=False)
         test_db.create_all_tables(mock_metadata)
         assert set(test_db.tables.keys()) == set(mock_metadata.tables.keys())
     finally:
-        drop_database(db_url)
+        with test_db.begin() as conn:
+            mock_metadata.drop_all(conn)
+        test_db.dispose()
 
 
-def test_create_table(request: FixtureRequest) -> None:
-    """Tests the method `DBConnection.create_table()`."""
+@pytest.mark.parametrize(
+    "reflect",
+    [
+        param(True, id="With reflection"),
+        param(False, id="No reflection"),
+    ],
+)
+def test_create_table(empty_db_url: URL, reflect: bool) -> None:
+    """Tests the method `DBConnection.create_table()`.
 
-    # Create a test db
-    db_url = make_url(request.config.getoption("server"))
-    db_name = f"{TEST_USERNAME}_test_create_table"
-    db_url = db_url.set(database=db_name)
-    if database_exists(db_url):
-        drop_database(db_url)
-    create_database(db_url)
+    Args:
+        empty_db_url: Fixture that provides the URL of an empty database.
+        reflect: Reflect the database schema when creating the connection.
 
+    """
+    # Do not keep idle connections around, as the connection is only used for a couple of statements
+    test_db = DBConnection(empty_db_url, reflect=reflect, poolclass=NullPool)
     try:
-        test_db = DBConnection(db_url, reflect=False)
         test_db.create_table(mock_metadata.tables["mock_table"])
         assert set(test_db.tables.keys()) == set(["mock_table"])
     finally:
-        drop_database(db_url)
+        with test_db.begin() as conn:
+            mock_metadata.drop_all(conn)
+        test_db.dispose()
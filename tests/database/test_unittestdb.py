@@ -20,9 +20,10 @@ from pathlib import Path
 from typing import ContextManager, Optional
 
 import pytest
-from pytest import FixtureRequest, param, raises
+from pytest import FixtureRequest, MonkeyPatch, param, raises
 from sqlalchemy_utils.functions import database_exists
 from sqlalchemy import Integer, text, Sequence, String
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.orm import Mapped
 from sqlalchemy.schema import MetaData
 
@@ -39,7 +40,9 @@ except ImportError:
 
     MockBase = declarative_base()  # type: ignore
 
-from ensembl.utils.database import UnitTestDB
+from ensembl.utils.database import DBConnection, UnitTestDB
+from ensembl.utils.database import unittestdb
+from ensembl.utils.database.unittestdb import _split_sql_statements
 
 
 class MockTable(MockBase):
@@ -54,6 +57,24 @@ class MockTable(MockBase):
 
 mock_metadata = MockBase.metadata
 
+# Query to count the rows in "gibberish" table
+_COUNT_QUERY = text("SELECT COUNT(*) FROM gibberish")
+
+
+def _database_exists(url: str) -> bool:
+    """Returns True if the database exists, False otherwise.
+
+    SQLite databases are files, so check the file directly instead of opening a connection to it.
+
+    Args:
+        url: Database URL.
+
+    """
+    db_url = make_url(url)
+    if db_url.get_backend_name() == "sqlite":
+        return Path(str(db_url.database)).exists()
+    return database_exists(db_url)
+
 
 class TestUnitTestDB:
     """Tests `UnitTestDB` class."""
@@ -63,9 +84,32 @@ class TestUnitTestDB:
         server_url = request.config.getoption("server")
         db = UnitTestDB(server_url, tmp_path=tmp_path, name="test_drop")
         db_url = db.dbc.url
-        assert database_exists(db_url)
+        assert _database_exists(db_url)
         db.drop()
-        assert not database_exists(db_url)
+        assert not _database_exists(db_url)
+
+    def test_drop_server_database(
+        self, request: FixtureRequest, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        """Tests that `UnitTestDB.drop()` passes a URL object when dropping a server database.
+
+        Args:
+            request: Fixture that provides information of the requesting test function.
+            tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+            monkeypatch: Fixture that allows to safely patch and mock functionality in tests.
+
+        """
+        server_url = request.config.getoption("server")
+        with UnitTestDB(server_url, tmp_path=tmp_path, name="test_drop_server") as test_db:
+            dropped: list = []
+            with monkeypatch.context() as m:
+                # Go through the server code path without dropping the database yet
+                m.setattr(DBConnection, "dialect", property(lambda self: "mysql"))
+                m.setattr(unittestdb, "_drop_database", dropped.append)
+                test_db.drop()
+            assert len(dropped) == 1
+            assert isinstance(dropped[0], URL)
+            assert dropped[0] == make_url(test_db.dbc.url)
 
     @pytest.mark.parametrize(
         "src, name, expectation",
@@ -103,8 +147,8 @@ class TestUnitTestDB:
                 assert test_db.dbc, "UnitTestDB's database connection should not be empty"
                 # Check that the database has been loaded correctly from the dump files
                 with test_db.dbc.test_session_scope() as session:
-                    result = session.execute(text("SELECT * FROM gibberish"))
-                    assert len(result.fetchall()) == 6, "Unexpected number of rows found in 'gibberish' table"
+                    num_rows = session.execute(_COUNT_QUERY).scalar_one()
+                    assert num_rows == 6, "Unexpected number of rows found in 'gibberish' table"
 
     @pytest.mark.parametrize(
         "metadata, tables",
@@ -134,3 +178,49 @@ class TestUnitTestDB:
             assert test_db, "UnitTestDB should not be empty"
             assert test_db.dbc, "UnitTestDB's database connection should not be empty"
             assert set(test_db.dbc.tables.keys()) == set(tables), "Loaded tables as expected"
+
+    def test_load_short_rows(self, request: FixtureRequest, tmp_path: Path) -> None:
+        """Tests that `UnitTestDB` sets to NULL the missing trailing values of the rows of an SQLite dump.
+
+        Args:
+            request: Fixture that provides information of the requesting test function.
+            tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+
+        """
+        server_url = request.config.getoption("server")
+        if make_url(server_url).get_backend_name() != "sqlite":
+            pytest.skip("Only SQLite fills the missing values of the imported rows")
+        dump_dir = tmp_path / "short_rows_db"
+        dump_dir.mkdir()
+        (dump_dir / "table.sql").write_text("CREATE TABLE short_rows (id INTEGER, grp TEXT, value INTEGER);")
+        (dump_dir / "short_rows.txt").write_text("1\ta\t10\n2\tb\n")
+        with UnitTestDB(server_url, dump_dir=dump_dir, tmp_path=tmp_path) as test_db:
+            with test_db.dbc.connect() as conn:
+                rows = conn.execute(text("SELECT * FROM short_rows ORDER BY id")).all()
+        assert [tuple(row) for row in rows] == [(1, "a", 10), (2, "b", None)]
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        param("", [], id="Empty string"),
+        param("SELECT 1;\nSELECT 2;\n", ["SELECT 1", "\nSELECT 2"], id="Two statements"),
+        param("SELECT 1", ["SELECT 1"], id="No trailing semicolon"),
+        param("SELECT 'a;b';", ["SELECT 'a;b'"], id="Semicolon in single quotes"),
+        param('SELECT "a;b";', ['SELECT "a;b"'], id="Semicolon in double quotes"),
+        param("SELECT `a;b` FROM t;", ["SELECT `a;b` FROM t"], id="Semicolon in backticks"),
+        param("SELECT 'it\\'s;';", ["SELECT 'it\\'s;'"], id="Escaped quote"),
+        param("SELECT 1; -- a; b\nSELECT 2;", ["SELECT 1", " -- a; b\nSELECT 2"], id="Line comment"),
+        param("SELECT 1; # a; 'b\nSELECT 2;", ["SELECT 1", " # a; 'b\nSELECT 2"], id="Hash comment"),
+        param("SELECT /* a; b */ 1;", ["SELECT /* a; b */ 1"], id="Block comment"),
+    ],
+)
+def test_split_sql_statements(sql: str, expected: list[str]) -> None:
+    """Tests the `_split_sql_statements()` function.
+
+    Args:
+        sql: SQL statements to split.
+        expected: Expected list of statements.
+
+    """
+    assert _split_sql_statements(sql) == expected
@@ -19,6 +19,7 @@ Since certain elements are embedded within pytest itself, only the fixtures are
 # pylint: disable=too-many-positional-arguments
 
 from contextlib import nullcontext as does_not_raise
+import difflib
 from pathlib import Path
 from typing import Callable, ContextManager
 
@@ -78,6 +79,44 @@ def test_assert_files(
         assert_files(data_dir / left, data_dir / right)
 
 
+@pytest.mark.dependency(depends=["test_data_dir"])
+def test_assert_files_line_endings(assert_files: Callable, tmp_path: Path) -> None:
+    """Tests that the `assert_files` fixture considers equal two files that only differ in line endings.
+
+    Args:
+        assert_files: Fixture that provides an assertion function to compare two files.
+        tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+
+    """
+    unix_file = tmp_path / "unix.txt"
+    unix_file.write_bytes(b"first\nsecond\n")
+    windows_file = tmp_path / "windows.txt"
+    windows_file.write_bytes(b"first\r\nsecond\r\n")
+    assert_files(unix_file, windows_file)
+
+
+@pytest.mark.dependency(depends=["test_data_dir"])
+def test_assert_files_native_diff(assert_files: Callable, data_dir: Path) -> None:
+    """Tests that the `assert_files` fixture reports the same differences with `difflib_rs` as with `difflib`.
+
+    Args:
+        assert_files: Fixture that provides an assertion function to compare two files.
+        data_dir: Fixture that provides the path to the test data folder matching the test's name.
+
+    """
+    difflib_rs = pytest.importorskip("difflib_rs")
+    results = (data_dir / "file1.txt").read_text().splitlines(keepends=True)
+    expected = (data_dir / "file2.txt").read_text().splitlines(keepends=True)
+    diff_args = {"fromfile": "Test-made file file1.txt", "tofile": "Expected file file2.txt"}
+    expected_diff = list(difflib.unified_diff(results, expected, **diff_args))
+    # The native implementation is called like the standard library one
+    assert list(difflib_rs.unified_diff(results, expected, **diff_args)) == expected_diff
+    with raises(AssertionError) as exc_info:
+        assert_files(data_dir / "file1.txt", data_dir / "file2.txt")
+    for line in expected_diff:
+        assert line.rstrip("\n") in str(exc_info.value)
+
+
 @pytest.mark.parametrize(
     "dump_dir, make_absolute, db_name, metadata, expected_db_name, expected_tables",
     [
@@ -125,7 +164,7 @@ def test_db_factory(
 
     assert test_db.dbc.url.startswith(request.config.getoption("server"))
     assert Path(test_db.dbc.db_name).stem.endswith(expected_db_name)
-    assert set(test_db.dbc.tables.keys()) == set(expected_tables)
+    assert test_db.dbc.tables.keys() == set(expected_tables)
 
 
 @pytest.mark.parametrize(
@@ -26,8 +26,12 @@ import requests.exceptions
 
 from ensembl.utils.rloader import RemoteFileLoader
 
+# Expected content of the parsed "sample.ini" file
+_EXPECTED_INI = configparser.ConfigParser()
+_EXPECTED_INI["DEFAULT"] = {"DEBUG": "True", "SECRET_KEY": "out_secret"}
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class MockResponse:
     """Mocks `Response` object returned by `requests.get()` function."""
 
@@ -39,9 +43,7 @@ def mock_requests_get(
     file_path: Path, *args: Any, **kwargs: Any  # pylint: disable=unused-argument
 ) -> MockResponse:
     """Mocks `requests.get()` function, bypassing the required internet connection."""
-    with file_path.open("r") as in_file:
-        content = in_file.read()
-    return MockResponse(text=content)
+    return MockResponse(text=file_path.read_text())
 
 
 class TestRemoteFileLoader:
@@ -84,9 +86,7 @@ class TestRemoteFileLoader:
         mock_get.side_effect = mock_requests_get
         loader = RemoteFileLoader("ini")
         content = loader.r_open(data_dir / "sample.ini")
-        parser = configparser.ConfigParser()
-        parser["DEFAULT"] = {"DEBUG": "True", "SECRET_KEY": "out_secret"}
-        assert content == parser
+        assert content == _EXPECTED_INI
 
     @patch("requests.get")
     def test_r_open_status_code(self, mock_get: Mock) -> None:
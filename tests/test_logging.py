@@ -16,12 +16,34 @@
 
 import argparse
 import logging
+from logging.handlers import QueueHandler
 from pathlib import Path
+from typing import Generator
 
 import pytest
 from pytest import param
 
 from ensembl.utils.logging import LogLevel, init_logging, init_logging_with_args
+from ensembl.utils.logging import _CachedTimeFormatter, _stop_queue_listener
+
+
+@pytest.fixture(name="restore_root_logger", autouse=True)
+def fixture_restore_root_logger() -> Generator[None, None, None]:
+    """Closes the handlers added to the root logger by each test and restores its level afterwards.
+
+    Only the handlers added by the test are removed: any handler removed by the test has been closed.
+
+    """
+    handlers = set(logging.root.handlers)
+    level = logging.root.level
+    yield
+    # Stop the background logging system (if any), closing its handlers
+    _stop_queue_listener()
+    for handler in logging.root.handlers[:]:
+        if handler not in handlers:
+            logging.root.removeHandler(handler)
+            handler.close()
+    logging.root.setLevel(level)
 
 
 @pytest.mark.parametrize(
@@ -51,6 +73,73 @@ def test_init_logging(tmp_path: Path, log_level: LogLevel, log_file: str) -> Non
         assert handler.level == log_level
 
 
+def test_init_logging_unbuffered(tmp_path: Path) -> None:
+    """Tests that `init_logging()` writes every message into the log file as soon as it is logged by default.
+
+    Args:
+        tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+
+    """
+    log_file = tmp_path / "app.log"
+    init_logging(log_file=log_file)
+    logging.debug("first")
+    assert len(log_file.read_text().splitlines()) == 1
+
+
+def test_init_logging_buffer(tmp_path: Path) -> None:
+    """Tests that `init_logging()` buffers the messages written into the log file.
+
+    Args:
+        tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+
+    """
+    log_file = tmp_path / "app.log"
+    init_logging(log_file=log_file, buffer_capacity=3)
+    logging.debug("first")
+    logging.debug("second")
+    assert not log_file.exists(), "Messages should be buffered until the buffer is full"
+    logging.debug("third")
+    assert len(log_file.read_text().splitlines()) == 3
+    logging.info("fourth")
+    logging.error("fifth")
+    assert len(log_file.read_text().splitlines()) == 5, "Error messages should flush the buffer"
+    logging.debug("sixth")
+    # Re-initialising the logging system closes the previous handlers, writing any buffered message
+    init_logging()
+    assert len(log_file.read_text().splitlines()) == 6
+
+
+def test_init_logging_background(tmp_path: Path) -> None:
+    """Tests `init_logging()` function handling the messages in a background thread.
+
+    Args:
+        tmp_path: Fixture that provides a temporary directory path unique to the test invocation.
+
+    """
+    log_file = tmp_path / "app.log"
+    init_logging(log_file=log_file, background=True)
+    assert len(logging.root.handlers) == 1
+    assert isinstance(logging.root.handlers[0], QueueHandler)
+    logging.debug("first")
+    logging.warning("second")
+    # Re-initialising the logging system stops the background thread, writing any pending message
+    init_logging()
+    assert [line.split("\t")[-1] for line in log_file.read_text().splitlines()] == ["first", "second"]
+
+
+def test_cached_time_formatter() -> None:
+    """Tests that `_CachedTimeFormatter` formats the date/time like its parent class."""
+    date_format = r"%Y-%m-%d_%H:%M:%S"
+    formatter = _CachedTimeFormatter("%(asctime)s", datefmt=date_format)
+    expected_formatter = logging.Formatter("%(asctime)s", datefmt=date_format)
+    record = logging.makeLogRecord({})
+    for created in [1000.1, 1000.9, 1001.0, 1000.5]:
+        record.created = created
+        assert formatter.formatTime(record, date_format) == expected_formatter.formatTime(record, date_format)
+    assert formatter.formatTime(record, "%S") == expected_formatter.formatTime(record, "%S")
+    assert formatter.formatTime(record) == expected_formatter.formatTime(record)
+
+
 def test_init_logging_with_args() -> None:
     """Tests `init_logging_with_args()` function."""
     parser = argparse.ArgumentParser()